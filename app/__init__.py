@@ -4,11 +4,12 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
-from flask_mail import Mail
 from flask_jwt_extended import JWTManager
 from dotenv import load_dotenv
+from .startup import StartupProfile
+from .replica import RoutingSession, REPLICA_BIND, init_replica
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 login_manager = LoginManager()
 
 # --- Flask-Login user loader & unauthorized handler ---
@@ -29,59 +30,104 @@ def _unauthorized():
     return redirect(url_for("auth.login"))
 
 bcrypt = Bcrypt()
-mail = Mail()
 jwt = JWTManager()
+_mail = None
+
+def get_mail(app=None):
+    """Return the Flask-Mail extension, importing and initializing it on first use.
+
+    Mail is only needed when an OTP is sent, so it is kept out of ``create_app``.
+    """
+    global _mail
+    from flask import current_app
+    app = app or current_app._get_current_object()
+    if _mail is None:
+        from flask_mail import Mail
+        _mail = Mail()
+    if "mail" not in app.extensions:
+        _mail.init_app(app)
+    return _mail
 
 def create_app():
-    load_dotenv()
+    profile = StartupProfile()
+    with profile.phase("load_dotenv"):
+        load_dotenv()
 
     app = Flask(__name__, instance_relative_config=False)
+    app.startup_profile = profile
 
     # Core config
     app.config.from_mapping(
         SECRET_KEY=os.getenv("SECRET_KEY", "dev-key"),
         SQLALCHEMY_DATABASE_URI=os.getenv("DATABASE_URL", "sqlite:///sms.db"),
         SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        # Optional read replica: GET/HEAD reads go there (see app/replica.py)
+        SQLALCHEMY_BINDS={REPLICA_BIND: os.environ["DATABASE_REPLICA_URL"]} if os.getenv("DATABASE_REPLICA_URL") else {},
+        # How long a client keeps reading the primary after it writes
+        READ_YOUR_WRITES_SECONDS=int(os.getenv("READ_YOUR_WRITES_SECONDS", "10")),
         LOG_LEVEL=os.getenv("LOG_LEVEL", "INFO"),
         LOG_TO_CONSOLE=os.getenv("LOG_TO_CONSOLE", "false"),
+        # Longest an audit record waits to be batched before its fsync
+        AUDIT_MAX_LATENCY_MS=int(os.getenv("AUDIT_MAX_LATENCY_MS", "50")),
+        # Keys the audit log's hash chain; falls back to SECRET_KEY
+        AUDIT_HMAC_KEY=os.getenv("AUDIT_HMAC_KEY"),
         MAIL_SERVER=os.getenv("MAIL_SERVER", "localhost"),
         MAIL_PORT=int(os.getenv("MAIL_PORT", "25")),
         MAIL_USE_TLS=os.getenv("MAIL_USE_TLS", "false").lower() in {"1","true","yes","on"},
         MAIL_USERNAME=os.getenv("MAIL_USERNAME"),
         MAIL_PASSWORD=os.getenv("MAIL_PASSWORD"),
+        # Responses smaller than this are not worth compressing
+        COMPRESS_MIN_SIZE=int(os.getenv("COMPRESS_MIN_SIZE", "500")),
+        COMPRESS_LEVEL=int(os.getenv("COMPRESS_LEVEL", "6")),
+        # Directory where workers register for cross-process SSE relay (default: per-DB temp dir)
+        EVENTS_PEER_DIR=os.getenv("EVENTS_PEER_DIR"),
+        # Close SSE streams after this long (clients reconnect)
+        SSE_MAX_SECONDS=int(os.getenv("SSE_MAX_SECONDS", "300")),
+        # Under WSGI each stream holds a thread; cap them per process (ASGI streams are not counted)
+        SSE_MAX_STREAMS=int(os.getenv("SSE_MAX_STREAMS", "4")),
+        # Skip create_all on boot once the schema exists (e.g. every worker after a deploy)
+        DB_AUTO_CREATE=os.getenv("DB_AUTO_CREATE", "true").lower() in {"1","true","yes","on"},
     )
 
-    # Init extensions
-    db.init_app(app)
-    login_manager.init_app(app)
-    bcrypt.init_app(app)
-    mail.init_app(app)
-    jwt.init_app(app)
+    # Init extensions (mail is initialized lazily, see get_mail)
+    with profile.phase("extensions"):
+        db.init_app(app)
+        init_replica(app)
+        login_manager.init_app(app)
+        bcrypt.init_app(app)
+        jwt.init_app(app)
 
     # Blueprints
-    from .auth_routes import auth_bp
-    from .admin_routes import admin_bp
-    from .main_routes import main_bp
-    from .api_routes import api_bp
+    with profile.phase("blueprints"):
+        from .auth_routes import auth_bp
+        from .admin_routes import admin_bp
+        from .main_routes import main_bp
+        from .api_routes import api_bp
+
+        app.register_blueprint(main_bp)
+        app.register_blueprint(auth_bp)
+        app.register_blueprint(admin_bp, url_prefix="/admin")
+        app.register_blueprint(api_bp, url_prefix="/api")
 
-    app.register_blueprint(main_bp)
-    app.register_blueprint(auth_bp)
-    app.register_blueprint(admin_bp, url_prefix="/admin")
-    app.register_blueprint(api_bp, url_prefix="/api")
+        from .events import init_events
+        init_events(app)
 
     # Configure login_manager
     login_manager.login_view = "auth.login"
 
     # Logging (after app object exists)
-    try:
-        from .logging_setup import init_logging
-        init_logging(app)
-    except Exception:
-        # Never block startup due to logging
-        pass
+    with profile.phase("logging"):
+        try:
+            from .logging_setup import init_logging
+            init_logging(app)
+        except Exception:
+            # Never block startup due to logging
+            pass
 
     # Create DB tables
-    with app.app_context():
-        db.create_all()
+    if app.config["DB_AUTO_CREATE"]:
+        with profile.phase("create_all"), app.app_context():
+            db.create_all(bind_key=None)  # schema lives on the primary only
 
+    app.logger.debug("Startup profile: %s", profile.report())
     return app
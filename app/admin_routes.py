@@ -1,11 +1,16 @@
-import io, os, sqlite3
-from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file, current_app
-from flask_login import login_required
+import io, os
+from flask import Blueprint, render_template, request, redirect, url_for, flash, send_file, current_app, abort
+from flask_login import login_required, current_user
+from markupsafe import Markup
 from .utils import role_required
 from .models import Student, Teacher
-from .forms import StudentForm, TeacherForm
+from .forms import StudentForm, TeacherForm, BulkStudentForm
 from . import db
 from .encryption import encrypt_text, decrypt_text
+from .versioning import advance_versions, bump_version, conditional, get_version, table_versions
+from .fragment_cache import fragment_cache, fragment_key
+from .events import student_changed
+from .bulk import BulkError, parse_ids, bulk_update_grade, bulk_delete
 from werkzeug.utils import secure_filename
 
 admin_bp = Blueprint("admin", __name__)
@@ -14,12 +19,26 @@ admin_bp = Blueprint("admin", __name__)
 @admin_bp.route("/students")
 @login_required
 @role_required("admin","teacher")
+@conditional("students", variant=lambda: (current_user.id, current_user.role))
 def students_list():
-    students = Student.query.order_by(Student.id.desc()).all()
-    # decrypt addresses for display
-    for s in students:
-        s.address_plain = decrypt_text(s.address_encrypted)
-    return render_template("students_list.html", students=students)
+    # Table body is cached per change version / role; a hit skips query and render
+    key = fragment_key("students", get_version("students")[0], current_user.role)
+    rows = fragment_cache.get(key)
+    if rows is None:
+        students = Student.query.order_by(Student.id.desc()).all()
+        # decrypt addresses for display
+        for s in students:
+            s.address_plain = decrypt_text(s.address_encrypted)
+        rows = render_template("_students_rows.html", students=students)
+        fragment_cache.put(key, rows)
+    # No forms on this page: a 304 would hand back a stale CSRF token
+    return render_template("students_list.html", rows=Markup(rows))
+
+def _bulk_form():
+    form = BulkStudentForm()
+    if current_user.role != "admin":
+        form.action.choices = [c for c in form.action.choices if c[0] != "delete"]
+    return form
 
 @admin_bp.route("/students/new", methods=["GET","POST"])
 @login_required
@@ -34,7 +53,10 @@ def students_new():
             grade=form.grade.data
         )
         db.session.add(st)
+        bump_version("students")
         db.session.commit()
+        fragment_cache.invalidate("students")
+        student_changed("created", [st.id], {st.grade: 1})
         current_app.audit_logger.info(f'Student created: {st.name} ({st.email})')
         flash("Student created.", "success")
         return redirect(url_for("admin.students_list"))
@@ -49,11 +71,17 @@ def students_edit(sid):
     if request.method == "GET":
         form.address.data = decrypt_text(st.address_encrypted)
     if form.validate_on_submit():
+        old_grade = st.grade
         st.name = form.name.data.strip()
         st.email = form.email.data.strip()
         st.address_encrypted = encrypt_text(form.address.data.strip() if form.address.data else "")
         st.grade = form.grade.data
+        bump_version("students")
         db.session.commit()
+        fragment_cache.invalidate("students")
+        delta = {old_grade: -1}
+        delta[st.grade] = delta.get(st.grade, 0) + 1
+        student_changed("updated", [st.id], delta)
         current_app.audit_logger.info(f'Student updated: {st.id}')
         flash("Student updated.", "success")
         return redirect(url_for("admin.students_list"))
@@ -64,19 +92,54 @@ def students_edit(sid):
 @role_required("admin")
 def students_delete(sid):
     st = Student.query.get_or_404(sid)
+    grade = st.grade
     db.session.delete(st)
+    bump_version("students")
     db.session.commit()
+    fragment_cache.invalidate("students")
+    student_changed("deleted", [sid], {grade: -1})
     current_app.audit_logger.info(f'Student deleted: {sid}')
     flash("Student deleted.", "info")
     return redirect(url_for("admin.students_list"))
 
+@admin_bp.route("/students/bulk", methods=["GET","POST"])
+@login_required
+@role_required("admin","teacher")
+def students_bulk():
+    form = _bulk_form()
+    if request.method == "GET":
+        return render_template("students_bulk.html", form=form)
+    if not form.validate_on_submit():
+        flash("Invalid bulk request.", "danger")
+        return redirect(url_for("admin.students_bulk"))
+    if form.action.data == "delete" and current_user.role != "admin":
+        abort(403)
+    try:
+        ids = parse_ids(form.ids.data)
+        grade_filter = form.current_grade.data or None
+        if form.action.data == "delete":
+            affected = bulk_delete(ids, grade_filter, actor=current_user.username)
+            flash(f"{len(affected)} students deleted.", "info")
+        else:
+            affected = bulk_update_grade(form.grade.data, ids, grade_filter, actor=current_user.username)
+            flash(f"{len(affected)} students updated.", "success")
+    except BulkError as e:
+        flash(str(e), "danger")
+    return redirect(url_for("admin.students_list"))
+
 # --- Teachers CRUD ---
 @admin_bp.route("/teachers")
 @login_required
 @role_required("admin")
+@conditional("teachers", variant=lambda: (current_user.id, current_user.role))
 def teachers_list():
-    teachers = Teacher.query.order_by(Teacher.id.desc()).all()
-    return render_template("teachers_list.html", teachers=teachers)
+    key = fragment_key("teachers", get_version("teachers")[0], current_user.role)
+    rows = fragment_cache.get(key)
+    if rows is None:
+        teachers = Teacher.query.order_by(Teacher.id.desc()).all()
+        rows = render_template("_teachers_rows.html", teachers=teachers)
+        fragment_cache.put(key, rows)
+    return render_template("teachers_list.html", rows=Markup(rows))
 
 @admin_bp.route("/teachers/new", methods=["GET","POST"])
 @login_required
@@ -86,7 +149,9 @@ def teachers_new():
     if form.validate_on_submit():
         t = Teacher(name=form.name.data.strip(), email=form.email.data.strip(), department=form.department.data.strip() if form.department.data else None)
         db.session.add(t)
+        bump_version("teachers")
         db.session.commit()
+        fragment_cache.invalidate("teachers")
         current_app.audit_logger.info(f'Teacher created: {t.name}')
         flash("Teacher created.", "success")
         return redirect(url_for("admin.teachers_list"))
@@ -102,7 +167,9 @@ def teachers_edit(tid):
         t.name = form.name.data.strip()
         t.email = form.email.data.strip()
         t.department = form.department.data.strip() if form.department.data else None
+        bump_version("teachers")
         db.session.commit()
+        fragment_cache.invalidate("teachers")
         current_app.audit_logger.info(f'Teacher updated: {t.id}')
         flash("Teacher updated.", "success")
         return redirect(url_for("admin.teachers_list"))
@@ -114,12 +181,18 @@ def teachers_edit(tid):
 def teachers_delete(tid):
     t = Teacher.query.get_or_404(tid)
     db.session.delete(t)
+    bump_version("teachers")
     db.session.commit()
+    fragment_cache.invalidate("teachers")
     current_app.audit_logger.info(f'Teacher deleted: {tid}')
     flash("Teacher deleted.", "info")
     return redirect(url_for("admin.teachers_list"))
 
 # --- Backup / Restore ---
+def _sqlite_path():
+    # Flask-SQLAlchemy resolves relative sqlite URIs against the instance folder
+    return db.engine.url.database or "sms.db"
+
 @admin_bp.route("/backup")
 @login_required
 @role_required("admin")
@@ -131,7 +204,7 @@ def backup_page():
 @role_required("admin")
 def backup_download():
     # Read sqlite file and encrypt
-    db_path = "sms.db"
+    db_path = _sqlite_path()
     if not os.path.exists(db_path):
         flash("Database not found.", "danger")
         return redirect(url_for("admin.backup_page"))
@@ -169,9 +242,16 @@ def backup_restore():
         flash(f"Failed to decrypt backup: {e}", "danger")
         return redirect(url_for("admin.backup_page"))
     # Replace sqlite file
-    db_path = "sms.db"
+    db_path = _sqlite_path()
+    seen = table_versions()
+    db.session.remove()
     with open(db_path, "wb") as f:
         f.write(dec)
+    db.engine.dispose()
+    # Restored table versions may repeat ones clients and the fragment cache hold
+    db.create_all(bind_key=None)  # backups from before table_version existed
+    advance_versions(seen)
+    fragment_cache.clear()
     current_app.audit_logger.info('Backup restored by admin')
     flash("Restore completed. Please restart the app.", "success")
     return redirect(url_for("admin.backup_page"))
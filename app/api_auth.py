@@ -0,0 +1,157 @@
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+import jwt as pyjwt
+from flask import g, request, jsonify
+from flask_jwt_extended import decode_token
+from flask_jwt_extended.exceptions import NoAuthorizationError, RevokedTokenError, WrongTokenError
+from . import db, jwt
+from .models import RevokedToken
+
+class TokenCache:
+    """Bounded LRU of verified access-token claims keyed by ``jti``.
+
+    Entries live until the token's own ``exp``; a hit skips signature and
+    claim validation. The full token is stored and compared so a forged token
+    reusing a cached ``jti`` never matches.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, jti, token):
+        with self._lock:
+            entry = self._data.get(jti)
+            if entry is None:
+                return None
+            cached_token, claims = entry
+            if claims.get("exp", 0) <= time.time():
+                del self._data[jti]
+                return None
+            self._data.move_to_end(jti)
+        return claims if hmac.compare_digest(cached_token, token) else None
+
+    def put(self, jti, token, claims):
+        with self._lock:
+            self._data[jti] = (token, claims)
+            self._data.move_to_end(jti)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, jti):
+        with self._lock:
+            self._data.pop(jti, None)
+
+    def __len__(self):
+        return len(self._data)
+
+class RevocationList:
+    """Revoked ``jti`` values, stored in the ``revoked_token`` table until they expire.
+
+    Every worker checks the table, so a token revoked through one process is
+    rejected by all of them. Revocations this process has seen are also kept
+    in memory, which answers repeat requests with a revoked token without a
+    query.
+    """
+
+    def __init__(self):
+        self._expiry = {}
+        self._lock = threading.Lock()
+        self._next_prune = 0.0
+
+    def add(self, jti, exp):
+        exp = int(exp)
+        db.session.merge(RevokedToken(jti=jti, exp=exp))
+        db.session.commit()
+        self._remember(jti, exp)
+
+    def __contains__(self, jti):
+        if jti is None:
+            return False
+        if jti in self._expiry:
+            return True
+        # Always the primary: a lagging replica would miss a fresh revocation
+        stmt = db.select(RevokedToken.exp).where(RevokedToken.jti == jti).execution_options(primary=True)
+        exp = db.session.execute(stmt).scalar()
+        if exp is None:
+            return False
+        self._remember(jti, exp)
+        return True
+
+    def _remember(self, jti, exp):
+        with self._lock:
+            self._expiry[jti] = exp
+            self._prune()
+
+    def _prune(self):
+        now = time.time()
+        if now < self._next_prune:
+            return
+        self._next_prune = now + 60
+        for jti in [j for j, exp in self._expiry.items() if exp <= now]:
+            del self._expiry[jti]
+        db.session.execute(db.delete(RevokedToken).where(RevokedToken.exp <= now))
+        db.session.commit()
+
+token_cache = TokenCache(maxsize=int(os.getenv("JWT_CACHE_SIZE", "1024")))
+revoked_tokens = RevocationList()
+
+@jwt.token_in_blocklist_loader
+def _token_revoked(jwt_header, jwt_payload):
+    # Also enforced for any view still using flask_jwt_extended.jwt_required
+    return jwt_payload.get("jti") in revoked_tokens
+
+def revoke_token(claims):
+    jti = claims["jti"]
+    revoked_tokens.add(jti, claims.get("exp", time.time()))
+    token_cache.discard(jti)
+
+def _bearer_token():
+    auth = request.headers.get("Authorization", "")
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise NoAuthorizationError("Missing Authorization Header")
+    return token.strip()
+
+def verify_access_token(token):
+    """Return the claims of a valid, unrevoked access token (cached by ``jti``).
+
+    Errors are the flask_jwt_extended / PyJWT exceptions, so JWTManager's
+    error handlers produce the same responses as ``jwt_required``.
+    """
+    jti = pyjwt.decode(token, options={"verify_signature": False}).get("jti")
+    if jti in revoked_tokens:
+        raise RevokedTokenError(pyjwt.get_unverified_header(token), {"jti": jti})
+    claims = token_cache.get(jti, token) if jti else None
+    if claims is None:
+        claims = decode_token(token)
+        if claims.get("type") != "access":
+            raise WrongTokenError("Only non-refresh tokens are allowed")
+        token_cache.put(claims["jti"], token, claims)
+    return claims
+
+def api_auth_required(*roles):
+    """Authenticate the bearer token once per request and enforce ``roles``.
+
+    Replaces ``jwt_required()`` + a role check; the verified claims remain
+    available through ``flask_jwt_extended.get_jwt()``.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            claims = verify_access_token(_bearer_token())
+            # Same slots jwt_required fills, so get_jwt()/get_jwt_identity() keep working
+            g._jwt_extended_jwt = claims
+            g._jwt_extended_jwt_header = {}
+            g._jwt_extended_jwt_user = {"loaded_user": None}
+            g._jwt_extended_jwt_location = "headers"
+            if roles and claims.get("role") not in roles:
+                return jsonify(msg="Forbidden"), 403
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
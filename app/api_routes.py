@@ -1,11 +1,27 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt
-import hmac
+import json
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import create_access_token, get_jwt
 from .models import User, Student, Teacher
 from . import db
 from .encryption import decrypt_text
+from .versioning import bump_version, conditional
+from .compression import compress_response
+from .api_auth import api_auth_required, revoke_token
+from .events import student_changed
+from .fragment_cache import fragment_cache
+from .bulk import BulkError, parse_ids, bulk_update_grade, bulk_delete
 
 api_bp = Blueprint("api", __name__)
+api_bp.after_request(compress_response)
+
+# Compact shape: field names once, one array per row
+COLUMNAR_MIMETYPE = "application/vnd.sms.columnar+json"
+STUDENT_COLUMNS = ["id", "name", "email", "address", "grade"]
+
+def wants_columnar():
+    if "format" in request.args:
+        return request.args["format"] == "columnar"
+    return request.accept_mimetypes.best_match(["application/json", COLUMNAR_MIMETYPE]) == COLUMNAR_MIMETYPE
 
 @api_bp.post("/login")
 def api_login():
@@ -14,44 +30,65 @@ def api_login():
     password = data.get("password","")
     user = User.query.filter_by(username=username).first()
     if user and user.check_password(password):
-        token = create_access_token(identity=user.id, additional_claims={"role": user.role, "username": user.username})
+        token = create_access_token(identity=str(user.id), additional_claims={"role": user.role, "username": user.username})
         return jsonify(access_token=token, role=user.role), 200
     return jsonify(msg="Invalid credentials"), 401
 
-def role_required_api(*roles):
-    def decorator(fn):
-        def wrapper(*args, **kwargs):
-            claims = get_jwt()
-            if claims.get("role") not in roles:
-                return jsonify(msg="Forbidden"), 403
-            return fn(*args, **kwargs)
-        wrapper.__name__ = fn.__name__
-        return wrapper
-    return decorator
+@api_bp.post("/logout")
+@api_auth_required()
+def api_logout():
+    revoke_token(get_jwt())
+    return jsonify(msg="revoked"), 200
 
 @api_bp.get("/students")
-@jwt_required()
-@role_required_api("admin","teacher")
+@api_auth_required("admin","teacher")
+@conditional("students", variant=lambda: ("columnar" if wants_columnar() else "json",), vary=("Accept",))
 def api_students():
-    out = []
-    for s in Student.query.all():
-        out.append({
-            "id": s.id,
-            "name": s.name,
-            "email": s.email,
-            "address": decrypt_text(s.address_encrypted),
-            "grade": s.grade
-        })
-    return jsonify(out), 200
+    rows = [[s.id, s.name, s.email, decrypt_text(s.address_encrypted), s.grade] for s in Student.query.all()]
+    if wants_columnar():
+        body = json.dumps({"columns": STUDENT_COLUMNS, "rows": rows}, ensure_ascii=False, separators=(",", ":"))
+        resp = current_app.response_class(body, mimetype=COLUMNAR_MIMETYPE)
+    else:
+        resp = jsonify([dict(zip(STUDENT_COLUMNS, row)) for row in rows])
+    return resp, 200
 
 @api_bp.post("/students")
-@jwt_required()
-@role_required_api("admin","teacher")
+@api_auth_required("admin","teacher")
 def api_students_create():
     data = request.get_json(silent=True) or {}
     s = Student(name=data.get("name","").strip(), email=data.get("email","").strip(), grade=data.get("grade"))
     from .encryption import encrypt_text
     s.address_encrypted = encrypt_text(data.get("address",""))
     db.session.add(s)
+    bump_version("students")
     db.session.commit()
+    fragment_cache.invalidate("students")
+    student_changed("created", [s.id], {s.grade: 1})
     return jsonify(msg="created", id=s.id), 201
+
+@api_bp.post("/students/bulk")
+@api_auth_required("admin","teacher")
+def api_students_bulk():
+    # {"action": "update_grade"|"delete", "ids": [...], "filter": {"grade": "C"}, "grade": "B"}
+    data = request.get_json(silent=True) or {}
+    if not isinstance(data, dict):
+        return jsonify(msg="body must be a JSON object"), 400
+    action = data.get("action")
+    claims = get_jwt()
+    if action == "delete" and claims.get("role") != "admin":
+        return jsonify(msg="Forbidden"), 403
+    try:
+        ids = parse_ids(data.get("ids"))
+        grade_filter = data.get("filter") or {}
+        if not isinstance(grade_filter, dict):
+            raise BulkError("filter must be an object")
+        grade_filter = grade_filter.get("grade")
+        if action == "delete":
+            affected = bulk_delete(ids, grade_filter, actor=claims.get("username"))
+        elif action == "update_grade":
+            affected = bulk_update_grade(data.get("grade"), ids, grade_filter, actor=claims.get("username"))
+        else:
+            return jsonify(msg="action must be update_grade or delete"), 400
+    except BulkError as e:
+        return jsonify(msg=str(e)), 400
+    return jsonify(affected=len(affected), ids=affected), 200
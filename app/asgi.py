@@ -0,0 +1,169 @@
+import asyncio
+import contextvars
+import io
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+class WsgiToAsgi:
+    """Serve the Flask (WSGI) app from an ASGI server such as uvicorn.
+
+    Connections are handled on the event loop, so idle keep-alive sockets and
+    slow clients cost a coroutine rather than a worker. Application code (DB
+    queries, Fernet, bcrypt) runs in a bounded thread pool: a thread is held
+    while the view computes its response and again for every ``next()`` on a
+    streamed body. Writing to the socket happens on the loop, so a slow
+    reader holds no thread, but a generator that blocks between chunks
+    (waiting on a queue, sleeping) holds one for as long as it blocks, just
+    as it would under a threaded WSGI server.
+
+    Long-lived streams avoid that by putting an async iterator of bytes in
+    ``environ["sms.async_body"]``; it then replaces the WSGI body and is
+    driven on the event loop, holding no thread while it waits.
+    """
+
+    def __init__(self, wsgi_app, max_workers=None):
+        self.wsgi_app = wsgi_app
+        self.max_workers = max_workers or int(os.getenv("ASGI_THREADS", "8"))
+        self.executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="asgi")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] != "http":
+            raise RuntimeError(f"Unsupported ASGI scope type: {scope['type']}")
+        body = await self._read_body(receive)
+        disconnected = asyncio.Event()
+        watcher = asyncio.ensure_future(self._watch_disconnect(receive, disconnected))
+        try:
+            await self._respond(self._environ(scope, body), send, disconnected)
+        finally:
+            watcher.cancel()
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _read_body(receive):
+        chunks = []
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                break
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        return b"".join(chunks)
+
+    @staticmethod
+    async def _watch_disconnect(receive, event):
+        while True:
+            if (await receive())["type"] == "http.disconnect":
+                event.set()
+                return
+
+    @staticmethod
+    def _environ(scope, body):
+        server = scope.get("server") or ("localhost", 80)
+        client = scope.get("client") or ("", 0)
+        environ = {
+            "REQUEST_METHOD": scope["method"],
+            "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+            # PEP 3333: native strings carrying the raw bytes as latin-1
+            "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+            "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+            "SERVER_NAME": str(server[0]),
+            "SERVER_PORT": str(server[1]),
+            "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+            "REMOTE_ADDR": client[0],
+            "REMOTE_PORT": str(client[1]),
+            "CONTENT_LENGTH": str(len(body)),
+            "wsgi.version": (1, 0),
+            "wsgi.url_scheme": scope.get("scheme", "http"),
+            "wsgi.input": io.BytesIO(body),
+            "wsgi.errors": sys.stderr,
+            "wsgi.multithread": True,
+            "wsgi.multiprocess": True,
+            "wsgi.run_once": False,
+            # Present (None) so views can tell the server accepts an async body
+            "sms.async_body": None,
+        }
+        for name, value in scope.get("headers", []):
+            key = name.decode("latin-1").upper().replace("-", "_")
+            value = value.decode("latin-1")
+            if key == "CONTENT_TYPE":
+                environ["CONTENT_TYPE"] = value
+            elif key != "CONTENT_LENGTH":
+                key = f"HTTP_{key}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    async def _respond(self, environ, send, disconnected):
+        loop = asyncio.get_running_loop()
+        # One Context per request, entered by whichever pool thread runs the next
+        # step, so Flask's context-locals survive across threads while streaming.
+        ctx = contextvars.copy_context()
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in headers]
+            return lambda data: None  # legacy write() callable; Flask never uses it
+
+        def call():
+            result = self.wsgi_app(environ, start_response)
+            return result, iter(result)
+
+        result, chunks = await loop.run_in_executor(self.executor, ctx.run, call)
+        async_body = environ.get("sms.async_body")
+        if async_body is not None:
+            if hasattr(result, "close"):
+                await loop.run_in_executor(self.executor, ctx.run, result.close)
+            return await self._send_async_body(async_body, started, send, disconnected)
+        try:
+            headers_sent = False
+            while not disconnected.is_set():
+                chunk = await loop.run_in_executor(self.executor, ctx.run, next, chunks, None)
+                if not headers_sent:
+                    # start_response may be deferred until the first chunk of a generator
+                    await send({"type": "http.response.start", "status": started["status"],
+                                "headers": started["headers"]})
+                    headers_sent = True
+                if chunk is None:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                    break
+                if chunk:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        finally:
+            if hasattr(result, "close"):
+                await loop.run_in_executor(self.executor, ctx.run, result.close)
+
+    @staticmethod
+    async def _send_async_body(body, started, send, disconnected):
+        await send({"type": "http.response.start", "status": started["status"], "headers": started["headers"]})
+        gone = asyncio.ensure_future(disconnected.wait())
+        try:
+            while True:
+                chunk = asyncio.ensure_future(body.__anext__())
+                await asyncio.wait({chunk, gone}, return_when=asyncio.FIRST_COMPLETED)
+                if not chunk.done():
+                    # Client left while the stream was idle; stop waiting for the next event
+                    chunk.cancel()
+                    await asyncio.gather(chunk, return_exceptions=True)
+                    return
+                try:
+                    data = chunk.result()
+                except StopAsyncIteration:
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+                    return
+                await send({"type": "http.response.body", "body": data, "more_body": True})
+        finally:
+            gone.cancel()
+            await body.aclose()
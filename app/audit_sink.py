@@ -0,0 +1,259 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev server, no cross-process lock
+    fcntl = None
+
+GENESIS = "0" * 64
+_STOP = object()
+
+def audit_key(config=None):
+    """HMAC key for the chain: ``AUDIT_HMAC_KEY``, else the app's ``SECRET_KEY``.
+
+    The verifier resolves it the same way from the environment, so the two
+    agree without extra setup.
+    """
+    config = config or {}
+    key = (config.get("AUDIT_HMAC_KEY") or os.getenv("AUDIT_HMAC_KEY")
+           or config.get("SECRET_KEY") or os.getenv("SECRET_KEY", "dev-key"))
+    return key.encode("utf-8") if isinstance(key, str) else key
+
+def _digest(body, key):
+    canonical = json.dumps(body, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hmac.new(key, canonical, hashlib.sha256).hexdigest()
+
+def _chain(record, seq, prev, key):
+    """Return the stored line for ``record`` and its hash.
+
+    The hash is an HMAC-SHA256 of the canonical JSON of the record plus
+    ``seq`` and ``prev`` (the previous line's hash), so editing, dropping or
+    reordering any line breaks every hash after it, and without the key the
+    chain cannot be recomputed to hide the change.
+    """
+    body = {**record, "seq": seq, "prev": prev}
+    digest = _digest(body, key)
+    return json.dumps({**body, "hash": digest}, ensure_ascii=False, sort_keys=True), digest
+
+def _last_line(path, block=4096):
+    try:
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            end = pos = f.tell()
+            data = b""
+            while pos > 0:
+                pos = max(0, pos - block)
+                f.seek(pos)
+                data = f.read(end - pos)
+                lines = data.rstrip(b"\n").split(b"\n")
+                if len(lines) > 1 or pos == 0:
+                    return lines[-1].decode("utf-8", "replace")
+    except FileNotFoundError:
+        pass
+    return ""
+
+def _chain_state(line):
+    """``(next_seq, prev_hash)`` following ``line``; a fresh chain if it is not chained."""
+    try:
+        rec = json.loads(line)
+        return rec["seq"] + 1, rec["hash"]
+    except (ValueError, KeyError, TypeError):
+        return 0, GENESIS
+
+class GroupCommitHandler(logging.Handler):
+    """Durable, tamper-evident audit log sink.
+
+    ``emit`` only queues the formatted record. A writer thread takes what has
+    queued up (waiting at most ``max_latency`` seconds after the oldest
+    record, or until ``max_batch`` records), HMAC-chains the batch onto the
+    file's last line, writes it and fsyncs once for the whole batch. A record
+    carrying an ``audit_future`` gets its sequence number set on the future
+    once it is on disk.
+
+    Several processes may share the file: each batch is written under an
+    exclusive lock on ``<file>.lock`` and chains onto whatever the file ends
+    with at that moment. Rotation mirrors RotatingFileHandler (``.1`` ...
+    ``.backup_count``), and the chain continues across rotated files.
+    """
+
+    def __init__(self, filename, key, max_bytes=1_000_000, backup_count=10, max_batch=256, max_latency=0.05):
+        super().__init__()
+        self.baseFilename = os.path.abspath(filename)
+        self.key = key
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+        self._queue = queue.Queue()
+        self._writer = None
+        self._writer_pid = None
+        self._start_lock = threading.Lock()
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self._ensure_writer()
+        self._queue.put((time.monotonic(), line, getattr(record, "audit_future", None)))
+
+    def flush(self):
+        """Block until everything queued so far is on disk."""
+        if self._writer is not None and self._writer_pid == os.getpid():
+            self._queue.join()
+
+    def close(self):
+        if self._writer is not None and self._writer_pid == os.getpid() and self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join(timeout=5)
+        self._writer = None
+        super().close()
+
+    def _ensure_writer(self):
+        # Threads do not survive fork (gunicorn preload): start one per process
+        if self._writer is not None and self._writer_pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._writer is None or self._writer_pid != os.getpid():
+                self._queue = queue.Queue()
+                self._writer_pid = os.getpid()
+                self._writer = threading.Thread(target=self._run, daemon=True, name="audit-writer")
+                self._writer.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch, stop = [item], False
+            deadline = item[0] + self.max_latency
+            while len(batch) < self.max_batch:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is _STOP:
+                    stop = True
+                    break
+                batch.append(nxt)
+            try:
+                seqs = self._commit([line for _, line, _ in batch])
+                for (_, _, fut), seq in zip(batch, seqs):
+                    if fut is not None:
+                        fut.set_result(seq)
+            except Exception as e:
+                for _, _, fut in batch:
+                    if fut is not None:
+                        fut.set_exception(e)
+                logging.getLogger(__name__).exception("Audit batch write failed")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                self._queue.task_done()
+                return
+
+    def _commit(self, lines):
+        os.makedirs(os.path.dirname(self.baseFilename), exist_ok=True)
+        with open(self.baseFilename + ".lock", "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                return self._write_locked(lines)
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write_locked(self, lines):
+        last = _last_line(self.baseFilename)
+        if not last and self.backup_count:
+            last = _last_line(f"{self.baseFilename}.1")
+        seq, prev = _chain_state(last)
+        out, seqs = [], []
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                record = None
+            if not isinstance(record, dict):
+                record = {"message": line}
+            stored, prev = _chain(record, seq, prev, self.key)
+            out.append(stored + "\n")
+            seqs.append(seq)
+            seq += 1
+        data = "".join(out).encode("utf-8")
+        size = os.path.getsize(self.baseFilename) if os.path.exists(self.baseFilename) else 0
+        if self.max_bytes and self.backup_count and size and size + len(data) > self.max_bytes:
+            self._rotate()
+        fd = os.open(self.baseFilename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o640)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)  # the group commit: one fsync for the whole batch
+        finally:
+            os.close(fd)
+        return seqs
+
+    def _rotate(self):
+        for i in range(self.backup_count - 1, 0, -1):
+            src = f"{self.baseFilename}.{i}"
+            if os.path.exists(src):
+                os.replace(src, f"{self.baseFilename}.{i + 1}")
+        os.replace(self.baseFilename, f"{self.baseFilename}.1")
+
+def audit_files(path):
+    """Rotated files oldest first, then the live file."""
+    rotated = []
+    i = 1
+    while os.path.exists(f"{path}.{i}"):
+        rotated.append(f"{path}.{i}")
+        i += 1
+    return list(reversed(rotated)) + ([path] if os.path.exists(path) else [])
+
+def verify_chain(paths, key, expect_head=None):
+    """Check the HMAC chain across ``paths`` (oldest first).
+
+    Unchained lines before the first chained record are counted as legacy.
+    The first chained record anchors the check (earlier files may have been
+    rotated away); every later record must link to its predecessor. A keyed
+    chain cannot be rewritten, but its tail can still be cut off; pass a
+    head hash saved from an earlier run as ``expect_head`` to catch that.
+    """
+    result = {"files": list(paths), "records": 0, "legacy": 0, "errors": [], "head": None, "last_seq": None}
+    prev = seq = None
+    seen_head = expect_head is None
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                where = f"{os.path.basename(path)}:{lineno}"
+                try:
+                    rec = json.loads(line)
+                    stored_hash = rec.pop("hash")
+                    rec_prev, rec_seq = rec["prev"], rec["seq"]
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    if prev is None:
+                        result["legacy"] += 1
+                    else:
+                        result["errors"].append(f"{where}: unchained line inside the chain")
+                    continue
+                if not hmac.compare_digest(_digest(rec, key), str(stored_hash)):
+                    result["errors"].append(f"{where}: hash mismatch (record altered or wrong key)")
+                if prev is not None and (rec_prev != prev or rec_seq != seq + 1):
+                    result["errors"].append(f"{where}: chain break (expected seq {seq + 1})")
+                prev, seq = stored_hash, rec_seq
+                seen_head = seen_head or stored_hash == expect_head
+                result["records"] += 1
+    if not seen_head:
+        result["errors"].append(f"expected head {expect_head} not found (log truncated or rotated away)")
+    result["head"], result["last_seq"] = prev, seq
+    return result
@@ -0,0 +1,89 @@
+import re
+from flask import current_app
+from . import db
+from .models import Student
+from .versioning import bump_version
+from .logging_setup import audit
+from .events import student_changed
+from .fragment_cache import fragment_cache
+
+GRADES = ("A", "B", "C", "D", "F")
+
+class BulkError(ValueError):
+    """Invalid bulk request (bad grade, no selection...)."""
+
+def parse_ids(raw):
+    """Accept a list of ints or a comma/whitespace separated string of them."""
+    if raw is None:
+        return []
+    if isinstance(raw, str):
+        raw = [p for p in re.split(r"[\s,]+", raw) if p]
+    try:
+        return sorted({int(i) for i in raw})
+    except (TypeError, ValueError):
+        raise BulkError("Student IDs must be integers.")
+
+def _criteria(ids, grade):
+    conds = []
+    if ids:
+        conds.append(Student.id.in_(ids))
+    if grade:
+        if grade not in GRADES:
+            raise BulkError(f"Unknown grade filter: {grade}")
+        conds.append(Student.grade == grade)
+    if not conds:
+        # Never turn an empty selection into "every student"
+        raise BulkError("Select students by ID or by grade filter.")
+    return conds
+
+def _execute(stmt, conds):
+    """Run a set-based UPDATE/DELETE and return the affected IDs."""
+    dialect = db.session.get_bind().dialect
+    returning = dialect.update_returning if stmt.is_update else dialect.delete_returning
+    if returning:
+        return sorted(db.session.execute(stmt.returning(Student.id)).scalars())
+    ids = sorted(db.session.execute(db.select(Student.id).where(*conds)).scalars())
+    if ids:
+        db.session.execute(stmt)
+    return ids
+
+def _grade_counts(conds):
+    rows = db.session.execute(db.select(Student.grade, db.func.count()).where(*conds).group_by(Student.grade))
+    return dict(rows.all())
+
+def _commit(event, kind, affected, delta, **details):
+    if affected:
+        bump_version("students")
+    try:
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    audit(event, ids=affected, count=len(affected), **details)
+    if affected:
+        fragment_cache.invalidate("students")
+        student_changed(kind, affected, delta)
+    return affected
+
+def bulk_update_grade(new_grade, ids=None, grade=None, actor=None):
+    """Set ``new_grade`` on the selected students in one UPDATE; return affected IDs."""
+    if new_grade not in GRADES:
+        raise BulkError(f"Unknown grade: {new_grade}")
+    conds = _criteria(ids, grade)
+    before = _grade_counts(conds)
+    stmt = db.update(Student).where(*conds).values(grade=new_grade).execution_options(synchronize_session=False)
+    affected = _execute(stmt, conds)
+    current_app.logger.info("Bulk grade update -> %s: %d students", new_grade, len(affected))
+    delta = {g: -n for g, n in before.items()}
+    delta[new_grade] = delta.get(new_grade, 0) + len(affected)
+    return _commit("students_bulk_update", "updated", affected, delta, grade=new_grade, filter_grade=grade, actor=actor)
+
+def bulk_delete(ids=None, grade=None, actor=None):
+    """Delete the selected students in one DELETE; return affected IDs."""
+    conds = _criteria(ids, grade)
+    before = _grade_counts(conds)
+    stmt = db.delete(Student).where(*conds).execution_options(synchronize_session=False)
+    affected = _execute(stmt, conds)
+    current_app.logger.info("Bulk delete: %d students", len(affected))
+    return _commit("students_bulk_delete", "deleted", affected, {g: -n for g, n in before.items()},
+                   filter_grade=grade, actor=actor)
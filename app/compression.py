@@ -0,0 +1,75 @@
+import zlib
+from flask import request, current_app
+
+try:
+    import brotli
+except ImportError:  # optional dependency; gzip is always available
+    brotli = None
+
+# Content codings we may apply, in order of preference
+CONTENT_CODINGS = ("br", "gzip")
+
+_COMPRESSIBLE = ("application/json", "text/")
+
+def negotiate_encoding():
+    """Pick the best coding the client accepts, or None for identity."""
+    for coding in CONTENT_CODINGS:
+        if coding == "br" and brotli is None:
+            continue
+        if request.accept_encodings[coding] > 0:
+            return coding
+    return None
+
+def _compressor(coding, level):
+    """Return ``(process, flush, finish)`` callables for an incremental stream."""
+    if coding == "br":
+        c = brotli.Compressor(quality=min(level, 11))
+        return c.process, c.flush, c.finish
+    c = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31 -> gzip container
+    return c.compress, lambda: c.flush(zlib.Z_SYNC_FLUSH), c.flush
+
+def _compress_stream(chunks, coding, level):
+    # Flush after every chunk so each piece reaches the client as soon as the
+    # view produces it instead of waiting for the compressor's buffer to fill.
+    process, flush, finish = _compressor(coding, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode("utf-8")
+        yield process(chunk) + flush()
+    yield finish()
+
+def compress_response(resp):
+    """after_request hook: apply negotiated gzip/brotli to eligible responses."""
+    if resp.status_code == 304:
+        # A 304 must carry the Vary the 200 would have (RFC 9110 15.4.5); its
+        # ETag already names the coded variant the client holds (versioning.py)
+        resp.vary.add("Accept-Encoding")
+        return resp
+    if (resp.status_code < 200 or resp.status_code in (204, 206)
+            or "Content-Encoding" in resp.headers
+            or not (resp.mimetype or "").startswith(_COMPRESSIBLE) and not (resp.mimetype or "").endswith("+json")
+            or "no-transform" in resp.headers.get("Cache-Control", "")):
+        return resp
+    resp.vary.add("Accept-Encoding")
+    coding = negotiate_encoding()
+    if coding is None:
+        return resp
+    level = current_app.config.get("COMPRESS_LEVEL", 6)
+    if resp.is_streamed:
+        resp.response = _compress_stream(resp.response, coding, level)
+        resp.headers.pop("Content-Length", None)
+    else:
+        data = resp.get_data()
+        if len(data) < current_app.config.get("COMPRESS_MIN_SIZE", 500):
+            return resp
+        process, _, finish = _compressor(coding, level)
+        body = process(data) + finish()
+        if len(body) >= len(data):
+            return resp
+        resp.set_data(body)
+    resp.headers["Content-Encoding"] = coding
+    # A strong ETag identifies exact bytes, so the encoded variant gets its own tag
+    tag, weak = resp.get_etag()
+    if tag:
+        resp.set_etag(f"{tag}-{coding}", weak)
+    return resp
@@ -1,21 +1,21 @@
 import os
 from cryptography.fernet import Fernet, InvalidToken
 
-_key = os.getenv("ENCRYPTION_KEY", "").encode()
+# Built on first use rather than at import so that workers which never touch
+# encrypted fields (and gunicorn's master before fork) skip the key setup.
 _fernet = None
-if _key:
-    try:
-        _fernet = Fernet(_key)
-    except Exception:
-        _fernet = None
 
 def get_fernet():
     global _fernet
     if _fernet is None:
-        # Try to load again (in case env was set later)
+        # Read the key once; only retried while it is still unset (e.g. before
+        # create_app has loaded .env), never on the encrypt/decrypt hot path
         key = os.getenv("ENCRYPTION_KEY", "").encode()
         if key:
-            _fernet = Fernet(key)
+            try:
+                _fernet = Fernet(key)
+            except Exception:
+                _fernet = None
     return _fernet
 
 def encrypt_text(text: str) -> bytes:
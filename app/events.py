@@ -0,0 +1,226 @@
+import asyncio
+import atexit
+import glob
+import hashlib
+import hmac
+import json
+import logging
+import os
+import queue
+import socket
+import tempfile
+import stat
+import threading
+
+log = logging.getLogger(__name__)
+
+# Each relayed datagram starts with an HMAC-SHA256 of the JSON that follows
+_DIGEST_SIZE = hashlib.sha256().digest_size
+# UDP datagrams on loopback carry up to ~64 KiB; larger events drop their ID list
+_MAX_DATAGRAM = 60_000
+
+class _LoopQueue:
+    """Subscriber queue consumed by a coroutine; publishers on any thread hand
+    events to its event loop, so the consumer waits without holding a thread."""
+
+    def __init__(self, maxsize):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+
+    def put_nowait(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # loop already closed; the stream is gone
+
+    def _put(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+class EventBroker:
+    """Fan student change events out to connected SSE clients.
+
+    Delivery inside a process goes through one bounded queue per subscriber.
+    Across processes (gunicorn workers on one host) each broker binds a
+    loopback UDP socket and registers its port in ``peer_dir``; ``publish``
+    relays the event to every registered peer. The transport is set up lazily
+    and again after a fork, so it is safe with preload_app.
+
+    Any local process can send to a loopback port, so datagrams are signed
+    with ``key`` and unsigned or forged ones are dropped. ``peer_dir`` must be
+    a private directory (mode 0700, owned by this user); otherwise the relay
+    stays off and events are only delivered inside the process.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.peer_dir = None
+        self._key = None
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._sock = None
+        self._pid = None
+
+    def configure(self, peer_dir, key):
+        self.peer_dir = peer_dir
+        self._key = hmac.new(key, b"sms-events-relay", hashlib.sha256).digest()
+        self._close_transport()
+
+    # --- local fan-out ---
+    def subscribe(self):
+        self._ensure_transport()
+        q = queue.Queue(self.queue_size)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def subscribe_async(self):
+        """Like ``subscribe`` but for a coroutine on the running event loop."""
+        self._ensure_transport()
+        q = _LoopQueue(self.queue_size)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    def _deliver(self, event):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(event)
+            except queue.Full:
+                # Client fell behind; its deltas are no longer trustworthy
+                with q.mutex:
+                    q.queue.clear()
+                q.put_nowait({"type": "resync"})
+
+    def publish(self, event):
+        self._deliver(event)
+        self._relay(event)
+
+    # --- cross-worker transport ---
+    def _ensure_transport(self):
+        if self.peer_dir is None or (self._sock is not None and self._pid == os.getpid()):
+            return
+        with self._lock:
+            if self._sock is not None and self._pid == os.getpid():
+                return
+            if not _private_dir(self.peer_dir):
+                log.warning("Events peer dir %s is not a private directory of this user; "
+                            "cross-worker relay disabled", self.peer_dir)
+                self.peer_dir = None
+                return
+            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            sock.bind(("127.0.0.1", 0))
+            self._sock, self._pid = sock, os.getpid()
+            with open(self._peer_file(self._pid), "w") as f:
+                f.write(str(sock.getsockname()[1]))
+            threading.Thread(target=self._listen, args=(sock,), daemon=True, name="events-listener").start()
+
+    def _peer_file(self, pid):
+        return os.path.join(self.peer_dir, f"{pid}.port")
+
+    def _listen(self, sock):
+        while True:
+            try:
+                data, _ = sock.recvfrom(65535)
+            except OSError:
+                return  # socket closed
+            digest, payload = data[:_DIGEST_SIZE], data[_DIGEST_SIZE:]
+            if not hmac.compare_digest(digest, self._sign(payload)):
+                continue
+            try:
+                self._deliver(json.loads(payload))
+            except ValueError:
+                continue
+
+    def _sign(self, payload):
+        return hmac.new(self._key, payload, hashlib.sha256).digest()
+
+    def _relay(self, event):
+        self._ensure_transport()
+        if self._sock is None:
+            return
+        data = json.dumps(event).encode()
+        if len(data) > _MAX_DATAGRAM:
+            data = json.dumps({**event, "ids": None, "truncated": True}).encode()
+        data = self._sign(data) + data
+        for path in glob.glob(os.path.join(self.peer_dir, "*.port")):
+            pid = int(os.path.basename(path).split(".")[0])
+            if pid == self._pid:
+                continue
+            if os.name == "posix" and not _pid_alive(pid):
+                _remove(path)
+                continue
+            try:
+                with open(path) as f:
+                    port = int(f.read())
+                self._sock.sendto(data, ("127.0.0.1", port))
+            except (OSError, ValueError):
+                continue
+
+    def _close_transport(self):
+        if self._sock is not None and self._pid == os.getpid():
+            self._sock.close()
+            _remove(self._peer_file(self._pid))
+        self._sock = self._pid = None
+
+def _private_dir(path):
+    """Create ``path`` with mode 0700 if needed; True if it is a directory only we can write."""
+    try:
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISDIR(st.st_mode):
+        return False  # includes a symlink planted in its place
+    if os.name != "posix":
+        return True
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IRWXG | stat.S_IRWXO)
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+broker = EventBroker()
+atexit.register(broker._close_transport)
+
+def init_events(app):
+    """Point the broker at a peer directory shared by all workers of this deployment."""
+    peer_dir = app.config.get("EVENTS_PEER_DIR")
+    if not peer_dir:
+        # Workers serving the same database find each other; other apps on the host don't
+        digest = hashlib.sha1(app.config["SQLALCHEMY_DATABASE_URI"].encode()).hexdigest()[:12]
+        peer_dir = os.path.join(tempfile.gettempdir(), f"sms-events-{digest}")
+    key = app.config["SECRET_KEY"]
+    broker.configure(peer_dir, key.encode() if isinstance(key, str) else key)
+
+def student_changed(kind, ids, delta):
+    """Publish a committed student write: ``delta`` maps grade -> change in count."""
+    broker.publish({
+        "type": f"students.{kind}",
+        "ids": list(ids),
+        "delta": {g: n for g, n in delta.items() if g and n},
+    })
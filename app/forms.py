@@ -31,3 +31,10 @@ class TeacherForm(FlaskForm):
     email = StringField("Email", validators=[DataRequired(), Email(), Length(max=120)])
     department = StringField("Department")
     submit = SubmitField("Save")
+
+class BulkStudentForm(FlaskForm):
+    ids = StringField("Student IDs")
+    current_grade = SelectField("Current grade", choices=[("","Any"),("A","A"),("B","B"),("C","C"),("D","D"),("F","F")])
+    action = SelectField("Action", choices=[("update_grade","Set grade"),("delete","Delete")])
+    grade = SelectField("New grade", choices=[("A","A"),("B","B"),("C","C"),("D","D"),("F","F")])
+    submit = SubmitField("Apply")
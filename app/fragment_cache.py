@@ -0,0 +1,77 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from flask import request
+
+log = logging.getLogger(__name__)
+
+# The students table of a 10k roster renders to ~5.1 MB for admins and ~2.8 MB
+# for teachers; hold both role variants with room for the teachers table.
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+class FragmentCache:
+    """Size-bounded LRU of rendered template fragments.
+
+    Keys start with the table name and its change version (see versioning.py),
+    so a write in any worker makes older entries unreachable; ``invalidate``
+    additionally frees them right away in the worker that made the change.
+    Sizes are UTF-8 bytes.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._warned = set()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, html):
+        nbytes = len(html.encode())
+        if nbytes > self.max_bytes:
+            # Once per table: every render of it would otherwise log again
+            if key[0] not in self._warned:
+                self._warned.add(key[0])
+                log.warning("%s fragment is %d bytes, over FRAGMENT_CACHE_BYTES=%d; not cached",
+                            key[0], nbytes, self.max_bytes)
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._data[key] = (html, nbytes)
+            self.size += nbytes
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._data.popitem(last=False)
+                self.size -= evicted
+
+    def invalidate(self, table):
+        with self._lock:
+            for key in [k for k in self._data if k[0] == table]:
+                self.size -= self._data.pop(key)[1]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._data)
+
+fragment_cache = FragmentCache(max_bytes=int(os.getenv("FRAGMENT_CACHE_BYTES", str(DEFAULT_MAX_BYTES))))
+
+def fragment_key(table, version, role, args=()):
+    """Key for a table fragment: change version, viewer role and the query ``args`` the view reads.
+
+    Other query parameters don't change the fragment, so they must not
+    multiply the entries (``?x=1``, ``?x=2``... would each cache a copy).
+    """
+    return (table, version, tuple((name, tuple(request.args.getlist(name))) for name in args), role)
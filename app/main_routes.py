@@ -1,10 +1,26 @@
-from collections import Counter
-from flask import Blueprint, render_template, session, redirect, url_for
+import asyncio
+import json
+import queue
+import threading
+import time
+from flask import Blueprint, render_template, session, redirect, url_for, request, Response, current_app
 from flask_login import login_required, current_user
+from . import db
 from .models import Student
+from .events import broker
 
 main_bp = Blueprint("main", __name__)
 
+GRADE_LABELS = ["A","B","C","D","F"]
+# Comment line sent when idle so proxies and the browser keep the stream open
+SSE_HEARTBEAT_SECONDS = 15
+# Roles that may see which students changed; everyone else only gets grade totals
+SSE_DETAIL_ROLES = ("admin", "teacher")
+
+# Streams currently holding a server thread in this process (WSGI only)
+_open_streams = 0
+_streams_lock = threading.Lock()
+
 @main_bp.route("/")
 def index():
     return redirect(url_for("auth.login"))
@@ -15,9 +31,77 @@ def dashboard():
     # Require biometric completion
     if not session.get("bio_ok"):
         return redirect(url_for("auth.biometric"))
-    # Compute grade distribution
-    grades = [s.grade for s in Student.query.all() if s.grade]
-    counts = Counter(grades)
-    labels = ["A","B","C","D","F"]
-    data = [counts.get(k, 0) for k in labels]
-    return render_template("dashboard.html", labels=labels, data=data)
+    # Compute grade distribution in the database rather than loading every student
+    counts = dict(db.session.execute(
+        db.select(Student.grade, db.func.count()).where(Student.grade.isnot(None)).group_by(Student.grade)
+    ).all())
+    data = [counts.get(k, 0) for k in GRADE_LABELS]
+    return render_template("dashboard.html", labels=GRADE_LABELS, data=data)
+
+@main_bp.route("/dashboard/stream")
+@login_required
+def dashboard_stream():
+    # Server-sent events: grade-distribution deltas and student change events
+    if not session.get("bio_ok"):
+        return Response(status=403)
+    detail = current_user.role in SSE_DETAIL_ROLES
+    deadline = time.monotonic() + current_app.config.get("SSE_MAX_SECONDS", 300)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+    if "sms.async_body" in request.environ:
+        # Under the ASGI adapter the stream runs on the event loop and holds no thread
+        request.environ["sms.async_body"] = _stream_async(detail, deadline)
+        return Response(iter(()), mimetype="text/event-stream", headers=headers)
+
+    # Under a WSGI server every open stream pins a thread; keep some for other requests
+    if not _claim_stream():
+        return Response(status=503, headers={"Retry-After": "30"})
+    resp = Response(_stream_sync(detail, deadline), mimetype="text/event-stream", headers=headers)
+    resp.call_on_close(_release_stream)
+    return resp
+
+def _claim_stream():
+    global _open_streams
+    with _streams_lock:
+        if _open_streams >= current_app.config.get("SSE_MAX_STREAMS", 4):
+            return False
+        _open_streams += 1
+        return True
+
+def _release_stream():
+    global _open_streams
+    with _streams_lock:
+        _open_streams -= 1
+
+def _sse(event, detail):
+    if not detail:
+        event = {k: v for k, v in event.items() if k in ("type", "delta")}
+    return f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
+def _stream_sync(detail, deadline):
+    sub = broker.subscribe()
+    try:
+        yield "retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            try:
+                event = sub.get(timeout=SSE_HEARTBEAT_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            yield _sse(event, detail)
+    finally:
+        broker.unsubscribe(sub)
+
+async def _stream_async(detail, deadline):
+    sub = broker.subscribe_async()
+    try:
+        yield b"retry: 3000\n\n"
+        while time.monotonic() < deadline:
+            try:
+                event = await sub.get(timeout=SSE_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield b": keep-alive\n\n"
+                continue
+            yield _sse(event, detail).encode()
+    finally:
+        broker.unsubscribe(sub)
@@ -31,3 +31,14 @@ class Teacher(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     department = db.Column(db.String(120), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class RevokedToken(db.Model):
+    """A revoked access token, kept until its ``exp`` so every worker rejects it."""
+    jti = db.Column(db.String(64), primary_key=True)
+    exp = db.Column(db.Integer, nullable=False, index=True)
+
+class TableVersion(db.Model):
+    """Change counter per table, bumped in the same transaction as each write."""
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
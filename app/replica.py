@@ -0,0 +1,155 @@
+import threading
+import time
+import sqlalchemy as sa
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+
+REPLICA_BIND = "replica"
+# API clients echo the pin back in this header or the cookie of the same name
+PIN_HEADER = "X-Read-Primary"
+PIN_COOKIE = "read_primary"
+
+class _ReplicaHealth:
+    """Cached availability of the replica; re-probed at most every ``interval`` seconds."""
+
+    def __init__(self, interval=10.0):
+        self.interval = interval
+        self._checked = {}
+        self._lock = threading.Lock()
+
+    def mark_down(self, engine):
+        with self._lock:
+            self._checked[engine] = (time.monotonic(), False)
+
+    def available(self, engine):
+        checked_at, ok = self._checked.get(engine, (None, False))
+        if checked_at is not None and time.monotonic() - checked_at < self.interval:
+            return ok
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            ok = True
+        except Exception:
+            ok = False
+        with self._lock:
+            self._checked[engine] = (time.monotonic(), ok)
+        return ok
+
+health = _ReplicaHealth()
+
+def _jwt_subject():
+    claims = g.get("_jwt_extended_jwt") or {}
+    return claims.get("sub")
+
+def _pin_serializer():
+    return URLSafeTimedSerializer(current_app.config["SECRET_KEY"], salt="read-primary")
+
+def _api_pinned(sub):
+    # The pin travels with the client, so any worker honours it
+    token = request.headers.get(PIN_HEADER) or request.cookies.get(PIN_COOKIE)
+    if not token:
+        return False
+    try:
+        pinned_sub = _pin_serializer().loads(token, max_age=current_app.config["READ_YOUR_WRITES_SECONDS"])
+    except BadSignature:
+        return False
+    return pinned_sub == sub
+
+def _reads_may_use_replica():
+    """Decide once per request whether SELECTs can go to the replica."""
+    decision = g.get("_db_read_replica")
+    if decision is None:
+        decision = request.method in ("GET", "HEAD") and not _primary_pinned()
+        g._db_read_replica = decision
+    return decision
+
+def _primary_pinned():
+    # Read-your-writes: a client that just wrote keeps reading the primary
+    sub = _jwt_subject()
+    if sub is not None:
+        return _api_pinned(sub)
+    return session.get("_primary_until", 0) > time.time()
+
+class RoutingSession(Session):
+    """Send SELECTs from read-only requests to the replica bind, everything else to the primary.
+
+    Reads stay on the primary when the request is not a GET/HEAD, once the
+    request has flushed a write, while the client is pinned after a recent
+    write, for statements marked ``execution_options(primary=True)``, and
+    whenever the replica is failing its health probe. A read that
+    fails on the replica is run again on the primary, which then serves the
+    rest of the request.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if has_request_context():
+            g._db_bind_replica = False
+        if (bind is None and isinstance(clause, (sa.sql.Select, sa.sql.CompoundSelect))
+                and not clause.get_execution_options().get("primary")
+                and has_request_context() and not g.get("_db_wrote")):
+            replica = self._db.engines.get(REPLICA_BIND)
+            if replica is not None and _reads_may_use_replica() and health.available(replica):
+                g._db_bind_replica = True
+                return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def execute(self, *args, **kwargs):
+        return self._read_with_fallback(super().execute, *args, **kwargs)
+
+    def scalar(self, *args, **kwargs):
+        return self._read_with_fallback(super().scalar, *args, **kwargs)
+
+    def scalars(self, *args, **kwargs):
+        return self._read_with_fallback(super().scalars, *args, **kwargs)
+
+    def _read_with_fallback(self, run, *args, **kwargs):
+        try:
+            return run(*args, **kwargs)
+        except sa.exc.DBAPIError:
+            if not (has_request_context() and g.pop("_db_bind_replica", False)):
+                raise
+            # Only reads go to the replica, so repeating the statement is safe
+            health.mark_down(self._db.engines[REPLICA_BIND])
+            g._db_read_replica = False
+            return run(*args, **kwargs)
+
+@sa.event.listens_for(RoutingSession, "after_flush")
+def _note_write(sess, flush_context):
+    if has_request_context():
+        g._db_wrote = True
+
+@sa.event.listens_for(RoutingSession, "do_orm_execute")
+def _note_statement_write(orm_execute_state):
+    # Set-based UPDATE/DELETE (bulk ops, version bumps) never go through flush
+    if has_request_context() and not orm_execute_state.is_select:
+        g._db_wrote = True
+
+def init_replica(app):
+    """Pin recent writers to the primary and trip the health check on replica errors."""
+    from . import db
+    if REPLICA_BIND not in app.config.get("SQLALCHEMY_BINDS", {}):
+        return
+    with app.app_context():
+        replica = db.engines[REPLICA_BIND]
+
+    @sa.event.listens_for(replica, "handle_error")
+    def _replica_error(context):
+        if context.is_disconnect or isinstance(context.original_exception, sa.exc.OperationalError):
+            health.mark_down(replica)
+
+    @app.after_request
+    def _pin_writer(response):
+        if g.get("_db_wrote"):
+            seconds = app.config["READ_YOUR_WRITES_SECONDS"]
+            sub = _jwt_subject()
+            if sub is not None:
+                # Signed and bound to the subject; clients that keep cookies echo it
+                # automatically, others can send the header back
+                token = _pin_serializer().dumps(sub)
+                response.headers[PIN_HEADER] = token
+                response.set_cookie(PIN_COOKIE, token, max_age=seconds, path="/api",
+                                    httponly=True, samesite="Strict")
+            else:
+                session["_primary_until"] = time.time() + seconds
+        return response
@@ -0,0 +1,41 @@
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupProfile:
+    """Collects wall-clock timings for the phases of ``create_app``."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases = []
+        self._modules_before = set(sys.modules)
+
+    @contextmanager
+    def phase(self, name):
+        t0 = time.perf_counter()
+        before = set(sys.modules)
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - t0
+            imported = sorted(set(sys.modules) - before)
+            self.phases.append({"phase": name, "ms": round(elapsed * 1000, 2), "imports": len(imported)})
+
+    @property
+    def total_ms(self):
+        return round(sum(p["ms"] for p in self.phases), 2)
+
+    def report(self):
+        return {
+            "total_ms": self.total_ms,
+            "phases": list(self.phases),
+            "modules_imported": len(set(sys.modules) - self._modules_before),
+        }
+
+    def format(self):
+        lines = [f"{'phase':<24}{'ms':>10}{'imports':>10}"]
+        for p in self.phases:
+            lines.append(f"{p['phase']:<24}{p['ms']:>10.2f}{p['imports']:>10}")
+        lines.append(f"{'total':<24}{self.total_ms:>10.2f}")
+        return "\n".join(lines)
@@ -1,7 +1,6 @@
 from functools import wraps
 from flask import abort, session, current_app
-from flask_mail import Message
-from . import mail
+from . import get_mail
 
 def role_required(*roles):
     def decorator(fn):
@@ -21,8 +20,9 @@ def send_email(subject, recipients, body):
     current_app.logger.info(f"Email to {recipients}: {body}")
     print(f"[EMAIL DEV] Subject: {subject}\nTo: {recipients}\n{body}\n")
     try:
+        from flask_mail import Message
         msg = Message(subject=subject, recipients=recipients, body=body)
-        mail.send(msg)
+        get_mail().send(msg)
         return True
     except Exception as e:
         current_app.logger.warning(f"Mail send failed: {e}")
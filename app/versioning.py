@@ -0,0 +1,121 @@
+from datetime import datetime
+from functools import wraps
+import hashlib
+from flask import g, has_request_context, request, session, make_response
+from . import db
+from .compression import CONTENT_CODINGS
+from .models import TableVersion
+
+def bump_version(table):
+    """Increment the change counter for ``table`` inside the current transaction.
+
+    Call before ``db.session.commit()`` so the bump commits (or rolls back)
+    together with the write it describes.
+    """
+    now = datetime.utcnow()
+    if has_request_context():
+        g.pop("_table_versions", None)
+    updated = db.session.execute(
+        db.update(TableVersion)
+        .where(TableVersion.name == table)
+        .values(version=TableVersion.version + 1, updated_at=now)
+    ).rowcount
+    if not updated:
+        db.session.add(TableVersion(name=table, version=1, updated_at=now))
+
+def get_version(table):
+    """Return ``(version, updated_at)``; ``(0, None)`` for a table never written.
+
+    Memoized for the rest of the request (until the next ``bump_version``),
+    so the conditional GET check and fragment caching share one lookup.
+    """
+    memo = g.setdefault("_table_versions", {}) if has_request_context() else {}
+    if table not in memo:
+        row = db.session.get(TableVersion, table)
+        memo[table] = (0, None) if row is None else (row.version, row.updated_at)
+    return memo[table]
+
+def table_versions():
+    """``{table: version}`` for every table written so far."""
+    return dict(db.session.execute(db.select(TableVersion.name, TableVersion.version)).all())
+
+def advance_versions(seen):
+    """Move every table's version past both ``seen`` and what is stored now, and commit.
+
+    For when the database file is replaced (backup restore): the restored
+    counters may repeat versions whose ETags clients still hold for other
+    data, so ``seen`` should be ``table_versions()`` taken before the swap.
+    """
+    now = datetime.utcnow()
+    current = table_versions()
+    for name in set(seen) | set(current):
+        version = max(seen.get(name, 0), current.get(name, 0)) + 1
+        row = db.session.get(TableVersion, name)
+        if row is None:
+            db.session.add(TableVersion(name=name, version=version, updated_at=now))
+        else:
+            row.version, row.updated_at = version, now
+    db.session.commit()
+    if has_request_context():
+        g.pop("_table_versions", None)
+
+def make_etag(table, version, *variant):
+    """Strong ETag for a table version and any representation variant (role, format...)."""
+    if not variant:
+        return f"{table}-{version}"
+    digest = hashlib.sha256("|".join(str(v) for v in variant).encode()).hexdigest()[:12]
+    return f"{table}-{version}-{digest}"
+
+def _not_modified(etag, last_modified):
+    """Return the ETag to answer a 304 with, or None when the client's copy is stale.
+
+    A compressed response carries the tag with a coding suffix (see
+    compression.py); the 304 repeats whichever variant the client holds.
+    """
+    if request.if_none_match:
+        # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+        for tag in (etag, *(f"{etag}-{c}" for c in CONTENT_CODINGS)):
+            if request.if_none_match.contains(tag):
+                return tag
+        return None
+    if last_modified is not None and request.if_modified_since is not None:
+        # HTTP dates have whole-second resolution: a client holding "12:00:00"
+        # may have missed a later write in that same second, so only a change
+        # strictly before the client's date is known to be in its copy
+        if last_modified < request.if_modified_since.replace(tzinfo=None):
+            return etag
+    return None
+
+def conditional(table, variant=None, vary=()):
+    """Answer GETs with 304 when the table has not changed since the client's copy.
+
+    The check only reads the ``table_version`` row, so an unchanged poll never
+    loads or decrypts the underlying rows. ``variant`` is an optional callable
+    returning extra values the response depends on (viewer role, format...);
+    ``vary`` names the request headers among them, sent on 200s and 304s alike.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD") or session.get("_flashes"):
+                # Pending flash messages are part of the page; always render them
+                return fn(*args, **kwargs)
+            version, updated_at = get_version(table)
+            etag = make_etag(table, version, *(variant() if variant else ()))
+            held = _not_modified(etag, updated_at)
+            if held:
+                resp = make_response("", 304)
+            else:
+                resp = make_response(fn(*args, **kwargs))
+                if resp.status_code != 200:
+                    return resp
+            resp.set_etag(held or etag)
+            for header in vary:
+                resp.vary.add(header)
+            if updated_at is not None:
+                resp.last_modified = updated_at
+            # Let clients and proxies keep a copy but revalidate on every use
+            resp.headers["Cache-Control"] = "private, no-cache"
+            return resp
+        return wrapper
+    return decorator
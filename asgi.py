@@ -0,0 +1,11 @@
+"""ASGI entry point (optional async serving mode).
+
+    pip install uvicorn
+    uvicorn asgi:app --host 0.0.0.0 --port 8000 --workers 2
+
+See app/asgi.py; ASGI_THREADS bounds the threads running application code.
+"""
+from app import create_app
+from app.asgi import WsgiToAsgi
+
+app = WsgiToAsgi(create_app())
@@ -0,0 +1,223 @@
+"""Concurrency load test: gunicorn sync workers vs. uvicorn + the ASGI adapter.
+
+    python -m benchmarks.asgi_concurrency --real --clients 100 --slots 2 --client-delay 2 [--path /login]
+    python -m benchmarks.asgi_concurrency --clients 200 --slots 2 --client-delay 0.5
+
+Both sides get the same number of application threads (``--slots``):
+``gunicorn -k sync -w SLOTS`` against ``uvicorn asgi:app`` with
+``ASGI_THREADS=SLOTS``.
+
+``--real`` (needs gunicorn and uvicorn installed) starts both servers and
+drives them over loopback with concurrent HTTP clients. First ``--slots``
+slow clients connect; each sends its request line and then waits
+``--client-delay`` seconds before sending the rest of its headers. Then
+``--clients`` ordinary clients arrive, and their latency is reported. A
+sync worker blocks on a slow client's socket for that whole time, so the
+ordinary clients queue behind it. uvicorn parses requests on the event
+loop. Behind a buffering proxy such as nginx, slow clients never reach
+gunicorn, so this is the unproxied worst case. Many slow clients *alone*
+cost a sync server little: the kernel queues them, and by the time a
+worker accepts one, its headers have usually arrived.
+
+Without ``--real`` the two models are only *simulated* in-process: a thread
+pool plus ``time.sleep`` stands in for sync workers, and ASGI messages are
+fed to the adapter directly. No sockets or servers are involved, and the
+result is labelled ``"mode": "simulation"``. It is quick and deterministic
+enough for the test suite, but it is not a server measurement.
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from app.asgi import WsgiToAsgi
+from benchmarks.seed import make_app, parse_size, seed, student_count
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _scope(path, headers):
+    return {"type": "http", "method": "GET", "path": path, "query_string": b"", "http_version": "1.1",
+            "scheme": "http", "server": ("127.0.0.1", 8000), "client": ("127.0.0.1", 50000),
+            "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()]}
+
+# --- Simulation (in-process) --------------------------------------------------
+
+def run_sync(app, path, headers, clients, slots, delay):
+    """Simulated sync workers: ``slots`` threads, each sleeping through the slow send."""
+    peak, active, lock = [0], [0], threading.Lock()
+    client = app.test_client()
+
+    def handle(_):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        status = client.get(path, headers=headers).status_code
+        time.sleep(delay)  # worker blocked writing to a slow client
+        with lock:
+            active[0] -= 1
+        return status
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(slots) as pool:
+        statuses = list(pool.map(handle, range(clients)))
+    return {"wall_s": round(time.perf_counter() - t0, 3), "max_in_flight": peak[0],
+            "ok": statuses.count(200)}
+
+def run_async(app, path, headers, clients, slots, delay):
+    """The real adapter with the same thread budget, fed simulated slow clients."""
+    asgi = WsgiToAsgi(app, max_workers=slots)
+    in_flight = {"now": 0, "peak": 0}
+
+    async def one():
+        statuses = []
+        in_flight["now"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+        sent_request = False
+
+        async def receive():
+            nonlocal sent_request
+            if not sent_request:
+                sent_request = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()  # client stays connected
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+            elif not message.get("more_body"):
+                await asyncio.sleep(delay)  # slow client draining the body
+
+        await asgi(_scope(path, headers), receive, send)
+        in_flight["now"] -= 1
+        return statuses[0]
+
+    async def main():
+        return await asyncio.gather(*(one() for _ in range(clients)))
+
+    t0 = time.perf_counter()
+    statuses = asyncio.run(main())
+    asgi.executor.shutdown()
+    return {"wall_s": round(time.perf_counter() - t0, 3), "max_in_flight": in_flight["peak"],
+            "ok": statuses.count(200)}
+
+def compare_models(app, headers, clients=50, slots=2, delay=0.2, path="/api/students"):
+    sync = run_sync(app, path, headers, clients, slots, delay)
+    asgi = run_async(app, path, headers, clients, slots, delay)
+    return {"mode": "simulation", "clients": clients, "slots": slots, "client_delay_s": delay,
+            "sync": sync, "asgi": asgi,
+            "speedup": round(sync["wall_s"] / asgi["wall_s"], 2) if asgi["wall_s"] else None}
+
+# --- Real servers over HTTP ----------------------------------------------------
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+@contextlib.contextmanager
+def real_server(kind, db_path, slots, timeout=30):
+    """Run gunicorn (sync workers) or uvicorn (asgi.py) against ``db_path``."""
+    port = _free_port()
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.abspath(db_path)}",
+               ASGI_THREADS=str(slots), GUNICORN_PRELOAD="false")
+    if kind == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}",
+               "-k", "sync", "--threads", "1", "-w", str(slots), "--timeout", "120", "run:app"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "asgi:app", "--host", "127.0.0.1", "--port", str(port),
+               "--workers", "1", "--log-level", "warning"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/login", timeout=1).close()
+                break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"{kind} did not start (exit code {proc.poll()})")
+                time.sleep(0.2)
+        yield port
+    finally:
+        proc.terminate()
+        proc.wait(10)
+
+async def _slow_request(port, path, headers, delay):
+    """GET ``path``, pausing ``delay`` seconds halfway through the request headers."""
+    t0 = time.perf_counter()
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    try:
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\n".encode("latin-1"))
+        await writer.drain()
+        await asyncio.sleep(delay)
+        rest = "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "Connection: close\r\n\r\n"
+        writer.write(rest.encode("latin-1"))
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        await reader.read()  # drain the body until the server closes
+    finally:
+        writer.close()
+    return status, time.perf_counter() - t0
+
+def run_real(kind, db_path, headers, clients, slots, delay, path="/api/students"):
+    """``slots`` slow clients occupy the server first, then ``clients`` ordinary
+    ones arrive; latencies are those of the ordinary clients."""
+    from benchmarks.run import percentile
+    with real_server(kind, db_path, slots) as port:
+        async def main():
+            slow = [asyncio.ensure_future(_slow_request(port, path, headers, delay)) for _ in range(slots)]
+            await asyncio.sleep(0.1)  # let the slow clients be accepted first
+            t0 = time.perf_counter()
+            fast = await asyncio.gather(*(_slow_request(port, path, headers, 0) for _ in range(clients)))
+            wall = time.perf_counter() - t0
+            return fast, await asyncio.gather(*slow), wall
+
+        fast, slow, wall = asyncio.run(main())
+    latencies = [s * 1000 for _, s in fast]
+    return {"server": kind, "wall_s": round(wall, 3), "ok": [s for s, _ in fast].count(200),
+            "slow_ok": [s for s, _ in slow].count(200),
+            "p50_ms": round(percentile(latencies, 50), 1), "p95_ms": round(percentile(latencies, 95), 1)}
+
+def compare_servers(db_path, headers, clients=50, slots=2, delay=0.2, path="/api/students"):
+    sync = run_real("gunicorn", db_path, headers, clients, slots, delay, path)
+    asgi = run_real("uvicorn", db_path, headers, clients, slots, delay, path)
+    return {"mode": "real", "clients": clients, "slots": slots, "client_delay_s": delay,
+            "sync": sync, "asgi": asgi,
+            "speedup": round(sync["wall_s"] / asgi["wall_s"], 2) if asgi["wall_s"] else None}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1000", help="students to seed (10k, 100k, 1m or a number)")
+    parser.add_argument("--db", help="default benchmarks/bench-<size>.db")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--slots", type=int, default=2)
+    parser.add_argument("--client-delay", type=float, default=0.5)
+    parser.add_argument("--path", default="/api/students")
+    parser.add_argument("--real", action="store_true",
+                        help="start gunicorn and uvicorn and load them over HTTP instead of simulating")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    db_path = args.db or os.path.join("benchmarks", f"bench-{args.size}.db")
+    app = make_app(db_path)
+    n = parse_size(args.size)
+    if student_count(app) != n:
+        seed(app, n)
+    from benchmarks.run import TestClientSession, api_token
+    headers = api_token(TestClientSession(app))
+    if args.real:
+        result = compare_servers(db_path, headers, args.clients, args.slots, args.client_delay, args.path)
+    else:
+        result = compare_models(app, headers, args.clients, args.slots, args.client_delay, args.path)
+    print(json.dumps(result, indent=2))
+
+if __name__ == "__main__":
+    main()
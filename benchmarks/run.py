@@ -0,0 +1,288 @@
+"""End-to-end benchmark: seeded roster, real login flow, list/API/backup pages.
+
+    python -m benchmarks.run --size 10k                 # in-process Flask test client
+    python -m benchmarks.run --size 100k --mode server --concurrency 8
+    python -m benchmarks.run --size 10k --update-baseline
+
+Results are written as JSON and compared against a baseline; the exit status
+is 1 when any metric regresses by more than --threshold.
+"""
+import argparse
+import contextlib
+import http.cookiejar
+import io
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from benchmarks.seed import make_app, parse_size, student_count
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+SCENARIOS = ["login", "admin_students", "dashboard", "api_students", "backup_download"]
+
+# --- Clients -----------------------------------------------------------------
+
+class TestClientSession:
+    """One logical browser/API client driven through the Flask test client."""
+
+    def __init__(self, app):
+        self.app = app
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None, json_body=None, headers=None):
+        resp = self.client.open(path, method=method, data=data, json=json_body, headers=headers or {})
+        body = resp.get_data()
+        return resp.status_code, body
+
+    def session_cookie(self):
+        cookie = self.client.get_cookie(self.app.config.get("SESSION_COOKIE_NAME", "session"))
+        return cookie.value if cookie else None
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+class HttpSession:
+    """One client talking to a real WSGI server over HTTP, with its own cookie jar."""
+
+    def __init__(self, app, base_url):
+        self.app = app
+        self.base_url = base_url
+        self.jar = http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.jar), _NoRedirect)
+
+    def request(self, method, path, data=None, json_body=None, headers=None):
+        headers = dict(headers or {})
+        payload = None
+        if json_body is not None:
+            payload = json.dumps(json_body).encode()
+            headers["Content-Type"] = "application/json"
+        elif data is not None:
+            payload = urllib.parse.urlencode(data).encode()
+            headers["Content-Type"] = "application/x-www-form-urlencoded"
+        req = urllib.request.Request(self.base_url + path, data=payload, headers=headers, method=method)
+        try:
+            with self.opener.open(req, timeout=120) as resp:
+                return resp.status, resp.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+    def session_cookie(self):
+        name = self.app.config.get("SESSION_COOKIE_NAME", "session")
+        return next((c.value for c in self.jar if c.name == name), None)
+
+@contextlib.contextmanager
+def local_server(app):
+    from werkzeug.serving import make_server
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+
+# --- Scenarios ---------------------------------------------------------------
+
+def _expect(status, expected, what):
+    if status not in expected:
+        raise RuntimeError(f"{what}: unexpected HTTP {status}")
+
+def web_login(sess, username="admin", password="Admin@123"):
+    """Password (bcrypt) -> OTP read back from the signed session -> biometric."""
+    status, _ = sess.request("POST", "/login", data={"username": username, "password": password})
+    _expect(status, (302,), "login")
+    serializer = sess.app.session_interface.get_signing_serializer(sess.app)
+    code = serializer.loads(sess.session_cookie())["otp_code"]
+    _expect(sess.request("POST", "/otp", data={"code": code})[0], (302,), "otp")
+    _expect(sess.request("POST", "/biometric")[0], (302,), "biometric")
+
+def api_token(sess, username="admin", password="Admin@123"):
+    status, body = sess.request("POST", "/api/login", json_body={"username": username, "password": password})
+    _expect(status, (200,), "api login")
+    return {"Authorization": f"Bearer {json.loads(body)['access_token']}"}
+
+def _get(path):
+    def op(sess, ctx):
+        _expect(sess.request("GET", path, headers=ctx)[0], (200,), path)
+    return op
+
+# name -> (per-client setup returning context, timed operation)
+SCENARIO_STEPS = {
+    "login": (lambda sess: None, lambda sess, ctx: web_login(sess)),
+    "admin_students": (web_login, _get("/admin/students")),
+    "dashboard": (web_login, _get("/dashboard")),
+    "api_students": (api_token, _get("/api/students")),
+    "backup_download": (web_login, _get("/admin/backup/download")),
+}
+
+# --- Measurement -------------------------------------------------------------
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    # nearest-rank definition
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+def peak_rss_mb():
+    """Peak RSS of this process so far (``ru_maxrss`` never goes down)."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(rss / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+def run_scenario(name, new_session, requests, concurrency):
+    setup, op = SCENARIO_STEPS[name]
+    latencies, errors = [], []
+    lock = threading.Lock()
+    remaining = [requests]
+
+    def worker():
+        # The login scenario measures a fresh session per flow; others reuse one
+        sess = new_session()
+        ctx = setup(sess)
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            if name == "login":
+                sess = new_session()
+            t0 = time.perf_counter()
+            try:
+                op(sess, ctx)
+            except Exception as e:
+                with lock:
+                    errors.append(str(e))
+                continue
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+
+    threads = [threading.Thread(target=worker) for _ in range(max(1, concurrency))]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - t0
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+    }
+
+def run_benchmarks(app, scenarios=SCENARIOS, requests=50, login_requests=10, concurrency=1, mode="client"):
+    def go(new_session):
+        return {name: run_scenario(name, new_session, login_requests if name == "login" else requests, concurrency)
+                for name in scenarios}
+
+    if mode == "server":
+        with local_server(app) as base_url:
+            results = go(lambda: HttpSession(app, base_url))
+    else:
+        results = go(lambda: TestClientSession(app))
+    return {
+        "meta": {
+            "students": student_count(app),
+            "mode": mode,
+            "concurrency": concurrency,
+            "python": platform.python_version(),
+        },
+        "scenarios": results,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+def compare(result, baseline, threshold=0.2):
+    """Return human-readable regressions of ``result`` against ``baseline``."""
+    problems = []
+    for key in ("students", "mode", "concurrency"):
+        if baseline.get("meta", {}).get(key) != result["meta"][key]:
+            problems.append(f"baseline {key} {baseline.get('meta', {}).get(key)!r} != {result['meta'][key]!r}")
+    for name, base in baseline.get("scenarios", {}).items():
+        cur = result["scenarios"].get(name)
+        if cur is None:
+            continue
+        if cur["errors"]:
+            problems.append(f"{name}: {cur['errors']} failed requests")
+        for key in ("p50_ms", "p99_ms"):
+            if base.get(key) and cur.get(key) and cur[key] > base[key] * (1 + threshold):
+                problems.append(f"{name}: {key} {cur[key]} > baseline {base[key]}")
+        if base.get("throughput_rps") and cur.get("throughput_rps") is not None \
+                and cur["throughput_rps"] < base["throughput_rps"] * (1 - threshold):
+            problems.append(f"{name}: throughput {cur['throughput_rps']} rps < baseline {base['throughput_rps']}")
+    base_rss, cur_rss = baseline.get("peak_rss_mb"), result.get("peak_rss_mb")
+    if base_rss and cur_rss and cur_rss > base_rss * (1 + threshold):
+        problems.append(f"peak RSS {cur_rss} MB > baseline {base_rss} MB")
+    return problems
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="10k", help="10k, 100k, 1m or a number of students")
+    parser.add_argument("--db", help="SQLite file (default benchmarks/bench-<size>.db, seeded on demand)")
+    parser.add_argument("--reseed", action="store_true")
+    parser.add_argument("--mode", choices=["client", "server"], default="client")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--login-requests", type=int, default=10)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--baseline", help="default benchmarks/baseline-<size>-<mode>.json")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed fractional regression")
+    parser.add_argument("--output", help="also write this run's JSON here")
+    args = parser.parse_args(argv)
+
+    from dotenv import load_dotenv
+    from app import db
+    load_dotenv()
+    n = parse_size(args.size)
+    db_path = args.db or os.path.join("benchmarks", f"bench-{args.size}.db")
+    app = make_app(db_path)
+    if args.reseed or student_count(app) != n:
+        # In a child process: peak RSS is a lifetime maximum, so seeding here
+        # would be charged to the scenarios
+        print(f"Seeding {n} students ...")
+        subprocess.run([sys.executable, "-m", "benchmarks.seed", "--students", str(n), "--db", db_path], check=True)
+        with app.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+    # OTP mails are printed to stdout by design; keep them out of the report
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = run_benchmarks(app, args.scenarios.split(","), args.requests,
+                                args.login_requests, args.concurrency, args.mode)
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+    baseline_path = args.baseline or os.path.join("benchmarks", f"baseline-{args.size}-{args.mode}.json")
+    if args.update_baseline or not os.path.exists(baseline_path):
+        with open(baseline_path, "w") as f:
+            json.dump(result, f, indent=2)
+        print(f"Baseline written to {baseline_path}")
+        return 0
+    with open(baseline_path) as f:
+        problems = compare(result, json.load(f), args.threshold)
+    for p in problems:
+        print(f"REGRESSION {p}")
+    return 1 if problems else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
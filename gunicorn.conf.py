@@ -0,0 +1,38 @@
+# Gunicorn settings. Used by the Dockerfile: gunicorn -c gunicorn.conf.py run:app
+import json
+import os
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+# Threaded workers: a dashboard event stream occupies one thread, not a whole
+# worker, and long streams are not killed by the sync worker timeout.
+# SSE_MAX_STREAMS (default 4) caps streams per worker below this.
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# Build the app (imports, blueprints, create_all) once in the master and fork
+# the workers from it instead of repeating create_app in every worker.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in {"1", "true", "yes", "on"}
+
+
+def post_fork(server, worker):
+    worker.forked_at = time.monotonic()
+    # Connections opened in the master (e.g. by create_all) must not be shared
+    # across processes; drop them so each worker opens its own pool.
+    if not preload_app:
+        return
+    from run import app
+    from app import db
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # Fork-to-ready time per worker, collected by `startup_report.py --gunicorn`
+    path = os.getenv("STARTUP_TIMINGS_FILE")
+    if path:
+        with open(path, "a") as f:
+            f.write(json.dumps({"pid": worker.pid, "preload": preload_app,
+                                "fork_to_ready_ms": round((time.monotonic() - worker.forked_at) * 1000, 2)}) + "\n")
@@ -0,0 +1,218 @@
+"""Print a startup profile: import cost of the main dependencies, the
+create_app phases and time-to-first-response.
+
+    python startup_report.py [--json] [--runs N] [--baseline FILE] [--tolerance 0.25]
+    python startup_report.py --gunicorn [--workers 2] [--runs N] [--baseline FILE]
+
+With ``--runs`` the measurement is repeated in N fresh interpreters and the
+medians are reported. ``--baseline`` compares the result against a stored
+report (benchmarks/startup_baseline.json, key "after") and exits non-zero
+if more modules are loaded or time-to-first-response regressed by more than
+the tolerance.
+
+``--gunicorn`` starts gunicorn with gunicorn.conf.py twice, with and without
+``preload_app``. For each run it reports how long each worker takes from fork
+until it is ready to serve, and the time from launch to the first response.
+This is where preloading saves time: every worker that is forked, restarted
+or added skips create_app. With ``--baseline`` the preloaded fork-to-ready
+time is checked against the stored "gunicorn" section.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+t0 = time.perf_counter()
+
+
+def import_times(modules):
+    # Must run before the app package is imported, otherwise everything is cached
+    out = []
+    for name in modules:
+        start = time.perf_counter()
+        __import__(name)
+        out.append({"module": name, "ms": round((time.perf_counter() - start) * 1000, 2)})
+    return out
+
+
+def measure():
+    imports = import_times([
+        "flask", "flask_sqlalchemy", "flask_login", "flask_bcrypt",
+        "flask_jwt_extended", "flask_wtf", "cryptography.fernet", "dotenv",
+    ])
+
+    from app import create_app
+
+    app = create_app()
+    ready = time.perf_counter()
+    resp = app.test_client().get("/login")
+    first = time.perf_counter()
+
+    return {
+        "imports": imports,
+        "create_app": app.startup_profile.report(),
+        "first_response_status": resp.status_code,
+        "time_to_ready_ms": round((ready - t0) * 1000, 2),
+        "time_to_first_response_ms": round((first - t0) * 1000, 2),
+        "modules_loaded": len(sys.modules),
+        "mail_loaded": "flask_mail" in sys.modules,
+    }
+
+
+def measure_runs(runs):
+    """Median of ``runs`` cold starts, each in a fresh interpreter."""
+    reports = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, __file__, "--json"], check=True,
+                             capture_output=True, text=True).stdout
+        reports.append(json.loads(out))
+    summary = dict(reports[-1])
+    summary["runs"] = runs
+    for key in ("time_to_ready_ms", "time_to_first_response_ms"):
+        summary[key] = round(statistics.median(r[key] for r in reports), 2)
+    summary["modules_loaded"] = max(r["modules_loaded"] for r in reports)
+    summary["mail_loaded"] = any(r["mail_loaded"] for r in reports)
+    return summary
+
+
+def compare(report, baseline, tolerance):
+    """Return a list of regressions of ``report`` against ``baseline``."""
+    problems = []
+    if report["modules_loaded"] > baseline["modules_loaded"]:
+        problems.append(f"modules_loaded {report['modules_loaded']} > baseline {baseline['modules_loaded']}")
+    if report["mail_loaded"] and not baseline["mail_loaded"]:
+        problems.append("flask_mail is imported during startup")
+    limit = baseline["time_to_first_response_ms"] * (1 + tolerance)
+    if report["time_to_first_response_ms"] > limit:
+        problems.append(f"time_to_first_response_ms {report['time_to_first_response_ms']:.1f} "
+                        f"> {limit:.1f} (baseline {baseline['time_to_first_response_ms']:.1f} +{tolerance:.0%})")
+    return problems
+
+
+def _gunicorn_once(preload, workers, timeout=30):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    fd, timings = tempfile.mkstemp(suffix=".jsonl")
+    os.close(fd)
+    env = dict(os.environ, GUNICORN_PRELOAD="true" if preload else "false", STARTUP_TIMINGS_FILE=timings)
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}",
+           "-w", str(workers), "run:app"]
+    root = os.path.dirname(os.path.abspath(__file__))
+    launched = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{port}/login", timeout=1).close()
+                break
+            except OSError:
+                if proc.poll() is not None or time.monotonic() > deadline:
+                    raise RuntimeError(f"gunicorn did not start (exit code {proc.poll()})")
+                time.sleep(0.005)
+        first = time.perf_counter()
+        while True:
+            with open(timings) as f:
+                rows = [json.loads(line) for line in f if line.strip()]
+            if len(rows) >= workers:
+                break
+            if time.monotonic() > deadline:
+                raise RuntimeError("gunicorn workers did not report their start-up time")
+            time.sleep(0.01)
+    finally:
+        proc.terminate()
+        proc.wait(10)
+        os.remove(timings)
+    return {"fork_to_ready_ms": statistics.median(r["fork_to_ready_ms"] for r in rows),
+            "launch_to_first_response_ms": round((first - launched) * 1000, 2)}
+
+
+def measure_gunicorn(workers=2, runs=3):
+    """Median fork-to-ready and launch-to-first-response, with and without preload_app."""
+    report = {"workers": workers, "runs": runs}
+    for name, preload in (("no_preload", False), ("preload", True)):
+        samples = [_gunicorn_once(preload, workers) for _ in range(runs)]
+        report[name] = {key: round(statistics.median(s[key] for s in samples), 2) for key in samples[0]}
+    return report
+
+
+def compare_gunicorn(report, baseline, tolerance, slack_ms=25):
+    """Regressions of a ``measure_gunicorn`` report against the baseline's "gunicorn" section.
+
+    Preloaded workers are ready within milliseconds, so a few ms of slack is
+    allowed on top of the relative tolerance.
+    """
+    problems = []
+    stored = baseline["preload"]["fork_to_ready_ms"]
+    limit = stored * (1 + tolerance) + slack_ms
+    if report["preload"]["fork_to_ready_ms"] > limit:
+        problems.append(f"preloaded fork_to_ready_ms {report['preload']['fork_to_ready_ms']:.1f} > {limit:.1f} "
+                        f"(baseline {stored:.1f})")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--runs", type=int, default=1)
+    parser.add_argument("--baseline", help="stored report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed time-to-first-response regression (fraction)")
+    parser.add_argument("--gunicorn", action="store_true",
+                        help="time gunicorn workers from fork to ready, with and without preload")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args(argv)
+
+    if args.gunicorn:
+        report = measure_gunicorn(args.workers, args.runs)
+        if args.json:
+            print(json.dumps(report, indent=2))
+        else:
+            print(f"{'gunicorn':<14}{'fork->ready ms':>16}{'launch->1st response ms':>26}")
+            for name in ("no_preload", "preload"):
+                row = report[name]
+                print(f"{name:<14}{row['fork_to_ready_ms']:>16.2f}{row['launch_to_first_response_ms']:>26.2f}")
+        if args.baseline:
+            with open(args.baseline) as fh:
+                problems = compare_gunicorn(report, json.load(fh)["gunicorn"], args.tolerance)
+            for problem in problems:
+                print(f"REGRESSION: {problem}", file=sys.stderr)
+            return 1 if problems else 0
+        return 0
+
+    report = measure_runs(args.runs) if args.runs > 1 else measure()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"{'module':<24}{'ms':>10}")
+        for row in report["imports"]:
+            print(f"{row['module']:<24}{row['ms']:>10.2f}")
+        print()
+        print(f"{'phase':<24}{'ms':>10}{'imports':>10}")
+        for p in report["create_app"]["phases"]:
+            print(f"{p['phase']:<24}{p['ms']:>10.2f}{p['imports']:>10}")
+        print()
+        print(f"time to ready:          {report['time_to_ready_ms']:>10.2f} ms")
+        print(f"time to first response: {report['time_to_first_response_ms']:>10.2f} ms")
+        print(f"modules loaded:         {report['modules_loaded']:>10}")
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)["after"]
+        problems = compare(report, baseline, args.tolerance)
+        for problem in problems:
+            print(f"REGRESSION: {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
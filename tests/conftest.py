@@ -0,0 +1,48 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, Student
+from app.encryption import encrypt_text
+from app.fragment_cache import fragment_cache
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    # Every test starts a fresh DB at version 0; don't reuse another test's fragments
+    fragment_cache.clear()
+    with app.app_context():
+        admin = User(username="admin", email="admin@example.com", role="admin")
+        admin.password_hash = "x"
+        teacher = User(username="teacher1", email="teacher1@example.com", role="teacher")
+        teacher.password_hash = "x"
+        db.session.add_all([admin, teacher])
+        for i, grade in enumerate("ABCB"):
+            db.session.add(Student(name=f"Student {i}", email=f"s{i}@example.com", grade=grade,
+                                   address_encrypted=encrypt_text(f"{i} Main St")))
+        db.session.commit()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def login(client, username="admin"):
+    """Log a test client in as ``username``, skipping the OTP/biometric steps."""
+    with client.application.app_context():
+        uid = User.query.filter_by(username=username).first().id
+    with client.session_transaction() as sess:
+        sess["_user_id"] = str(uid)
+        sess["_fresh"] = True
+        sess["bio_ok"] = True
+
+def api_headers(app, username="admin"):
+    with app.app_context():
+        user = User.query.filter_by(username=username).first()
+        token = create_access_token(identity=str(user.id), additional_claims={"role": user.role, "username": user.username})
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,55 @@
+import os
+import subprocess
+import sys
+from app import db
+from app.api_auth import TokenCache
+from app.models import User
+from app.api_routes import api_students
+from conftest import api_headers
+
+def test_verified_token_is_cached_and_reused(app, client, monkeypatch):
+    headers = api_headers(app)
+    assert client.get("/api/students", headers=headers).status_code == 200
+    calls = []
+    monkeypatch.setattr("app.api_auth.decode_token", lambda token: calls.append(token))
+    assert client.get("/api/students", headers=headers).status_code == 200
+    assert calls == []
+
+def test_role_and_missing_token(app, client):
+    assert client.get("/api/students").status_code == 401
+    with app.app_context():
+        db.session.add(User(username="student1", email="st@example.com", role="student", password_hash="x"))
+        db.session.commit()
+    assert client.get("/api/students", headers=api_headers(app, "student1")).status_code == 403
+
+def test_revoked_token_is_rejected(app, client):
+    headers = api_headers(app)
+    assert client.get("/api/students", headers=headers).status_code == 200
+    assert client.post("/api/logout", headers=headers).status_code == 200
+    assert client.get("/api/students", headers=headers).status_code == 401
+
+def test_token_revoked_in_another_process_is_rejected(app, client):
+    headers = api_headers(app)
+    assert client.get("/api/students", headers=headers).status_code == 200
+    # Another worker: its own interpreter, same database
+    status = subprocess.run([sys.executable, "-c", (
+        "import sys\n"
+        "from app import create_app\n"
+        "resp = create_app().test_client().post('/api/logout', headers={'Authorization': sys.argv[1]})\n"
+        "print(resp.status_code)\n"
+    ), headers["Authorization"]], cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=dict(os.environ), check=True, capture_output=True, text=True).stdout.split()[-1]
+    assert status == "200"
+    assert client.get("/api/students", headers=headers).status_code == 401
+
+def test_forged_token_with_cached_jti_does_not_hit(app):
+    cache = TokenCache(maxsize=2)
+    cache.put("j1", "token-a", {"exp": 2**40})
+    assert cache.get("j1", "token-b") is None
+    cache.put("j2", "t", {"exp": 2**40})
+    cache.put("j3", "t", {"exp": 2**40})
+    assert len(cache) == 2 and cache.get("j1", "token-a") is None
+
+def test_wrapper_preserves_view_metadata():
+    assert api_students.__name__ == "api_students"
+    assert hasattr(api_students, "__wrapped__")
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import pytest
+from app.asgi import WsgiToAsgi
+from benchmarks.asgi_concurrency import _scope, compare_models, compare_servers
+from conftest import api_headers, login
+
+def _call(asgi, scope, body=b""):
+    messages = []
+    async def receive():
+        if not messages:
+            messages.append(None)
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.Event().wait()
+    async def send(message):
+        messages.append(message)
+    asyncio.run(asgi(scope, receive, send))
+    start = messages[1]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in messages[2:])
+
+def test_get_and_post_through_adapter(app):
+    asgi = WsgiToAsgi(app, max_workers=2)
+    headers = api_headers(app)
+    status, resp_headers, body = _call(asgi, _scope("/api/students", headers))
+    assert status == 200 and resp_headers[b"content-type"] == b"application/json"
+    assert len(json.loads(body)) == 4
+
+    scope = {**_scope("/api/students", {**headers, "Content-Type": "application/json"}), "method": "POST"}
+    status, _, body = _call(asgi, scope, json.dumps({"name": "Async", "email": "async@example.com", "grade": "B"}).encode())
+    assert status == 201 and json.loads(body)["msg"] == "created"
+    assert _call(asgi, _scope("/api/students", {}))[0] == 401
+
+def test_open_streams_do_not_hold_app_threads(app, client):
+    # Two dashboards on a two-thread pool must not starve the API
+    asgi = WsgiToAsgi(app, max_workers=2)
+    login(client)
+    cookie = client.get_cookie(app.config.get("SESSION_COOKIE_NAME", "session"))
+    stream_scope = _scope("/dashboard/stream", {"Cookie": f"session={cookie.value}"})
+
+    async def main():
+        leave = asyncio.Event()
+        first_chunks = []
+
+        async def stream():
+            sent = False
+            async def receive():
+                nonlocal sent
+                if not sent:
+                    sent = True
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await leave.wait()
+                return {"type": "http.disconnect"}
+            async def send(message):
+                if message["type"] == "http.response.body":
+                    first_chunks.append(message["body"])
+            await asgi(stream_scope, receive, send)
+
+        streams = [asyncio.ensure_future(stream()) for _ in range(2)]
+        while len(first_chunks) < 2:
+            await asyncio.sleep(0.01)
+        statuses = []
+        async def receive():
+            if not statuses:
+                statuses.append(None)
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await asyncio.Event().wait()
+        async def send(message):
+            if message["type"] == "http.response.start":
+                statuses.append(message["status"])
+        await asyncio.wait_for(asgi(_scope("/api/students", api_headers(app)), receive, send), 5)
+        leave.set()
+        await asyncio.wait_for(asyncio.gather(*streams), 5)
+        return statuses[1], first_chunks
+
+    status, first_chunks = asyncio.run(main())
+    assert status == 200
+    assert first_chunks == [b"retry: 3000\n\n"] * 2
+
+def test_slow_clients_do_not_hold_app_threads(app):
+    result = compare_models(app, api_headers(app), clients=10, slots=2, delay=0.1)
+    assert result["mode"] == "simulation"
+    assert result["sync"]["ok"] == result["asgi"]["ok"] == 10
+    assert result["sync"]["max_in_flight"] == 2
+    assert result["asgi"]["max_in_flight"] == 10
+    assert result["asgi"]["wall_s"] < result["sync"]["wall_s"]
+
+def test_real_servers_with_slow_clients(app):
+    pytest.importorskip("gunicorn")
+    pytest.importorskip("uvicorn")
+    db_path = app.config["SQLALCHEMY_DATABASE_URI"].removeprefix("sqlite:///")
+    result = compare_servers(db_path, {}, clients=10, slots=2, delay=1.0, path="/login")
+    assert result["mode"] == "real"
+    assert result["sync"]["ok"] == result["asgi"]["ok"] == 10
+    # Both gunicorn workers are stuck on the slow senders; uvicorn is not
+    assert result["sync"]["p50_ms"] >= 800 > result["asgi"]["p50_ms"]
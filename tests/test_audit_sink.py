@@ -0,0 +1,93 @@
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import Future
+from app.audit_sink import GroupCommitHandler, audit_files, verify_chain
+
+KEY = b"test-audit-key"
+
+def _logger(tmp_path, **kwargs):
+    handler = GroupCommitHandler(str(tmp_path / "audit.log"), KEY, **kwargs)
+    logger = logging.getLogger(f"test-audit-{tmp_path.name}")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    return logger, handler
+
+def test_batch_is_fsynced_once_and_future_resolves(tmp_path, monkeypatch):
+    fsyncs = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(os, "fsync", lambda fd: (fsyncs.append(fd), real_fsync(fd)))
+    logger, handler = _logger(tmp_path, max_latency=0.5)
+    for i in range(99):
+        logger.info(json.dumps({"event": "e", "i": i}))
+    fut = Future()
+    logger.info(json.dumps({"event": "last"}), extra={"audit_future": fut})
+    assert fut.result(timeout=5) == 99
+    assert len(fsyncs) == 1
+    handler.close()
+    result = verify_chain(audit_files(handler.baseFilename), KEY)
+    assert result["records"] == 100 and result["errors"] == []
+
+def test_chain_detects_edits_and_deletions(tmp_path):
+    logger, handler = _logger(tmp_path, max_latency=0)
+    for i in range(5):
+        logger.info(json.dumps({"event": "e", "i": i}))
+    handler.close()
+    path = handler.baseFilename
+    lines = open(path).read().splitlines()
+
+    edited = lines.copy()
+    edited[2] = edited[2].replace('"i": 2', '"i": 9')
+    open(path, "w").write("\n".join(edited) + "\n")
+    assert "hash mismatch" in verify_chain([path], KEY)["errors"][0]
+
+    open(path, "w").write("\n".join(lines[:2] + lines[3:]) + "\n")
+    assert "chain break" in verify_chain([path], KEY)["errors"][0]
+
+def test_chain_continues_across_rotation_and_restart(tmp_path):
+    (tmp_path / "audit.log").write_text("legacy plain line\n")
+    logger, handler = _logger(tmp_path, max_bytes=600, backup_count=20, max_latency=0)
+    for i in range(10):
+        logger.info(json.dumps({"event": "e", "i": i}))
+    handler.close()
+    logger.removeHandler(handler)
+    logger, handler = _logger(tmp_path, max_bytes=600, backup_count=20, max_latency=0)
+    logger.info(json.dumps({"event": "after restart"}))
+    handler.close()
+    files = audit_files(handler.baseFilename)
+    assert len(files) > 2
+    result = verify_chain(files, KEY)
+    assert result == {**result, "records": 11, "legacy": 1, "errors": [], "last_seq": 10}
+
+def test_chain_cannot_be_rewritten_without_the_key(tmp_path):
+    logger, handler = _logger(tmp_path, max_latency=0)
+    for i in range(3):
+        logger.info(json.dumps({"event": "e", "i": i}))
+    handler.close()
+    path = handler.baseFilename
+    lines = [json.loads(line) for line in open(path)]
+
+    # Edit a record and recompute every plain SHA-256 link after it
+    lines[1]["i"] = 9
+    prev = lines[0]["hash"]
+    for rec in lines[1:]:
+        rec["prev"] = prev
+        body = {k: v for k, v in rec.items() if k != "hash"}
+        rec["hash"] = prev = hashlib.sha256(json.dumps(body, ensure_ascii=False, sort_keys=True).encode()).hexdigest()
+    open(path, "w").write("".join(json.dumps(rec, sort_keys=True) + "\n" for rec in lines))
+    assert "hash mismatch" in verify_chain([path], KEY)["errors"][0]
+    assert verify_chain([path], b"wrong-key")["errors"]
+
+def test_expected_head_catches_truncation(tmp_path):
+    logger, handler = _logger(tmp_path, max_latency=0)
+    for i in range(3):
+        logger.info(json.dumps({"event": "e", "i": i}))
+    handler.close()
+    path = handler.baseFilename
+    head = verify_chain([path], KEY)["head"]
+    assert verify_chain([path], KEY, expect_head=head)["errors"] == []
+    lines = open(path).read().splitlines()
+    open(path, "w").write("\n".join(lines[:-1]) + "\n")
+    assert "not found" in verify_chain([path], KEY, expect_head=head)["errors"][0]
@@ -0,0 +1,24 @@
+from benchmarks.run import compare, percentile, run_benchmarks
+from benchmarks.seed import seed, student_count
+
+def test_seed_and_run_all_scenarios(app):
+    seed(app, 30, chunk=8)
+    assert student_count(app) == 30
+    result = run_benchmarks(app, requests=3, login_requests=1)
+    assert result["meta"]["students"] == 30
+    for name, stats in result["scenarios"].items():
+        assert stats["errors"] == 0, name
+        assert stats["requests"] > 0 and stats["p99_ms"] >= stats["p50_ms"]
+
+def test_compare_flags_regressions():
+    base = {"meta": {"students": 10, "mode": "client", "concurrency": 1},
+            "scenarios": {"dashboard": {"errors": 0, "throughput_rps": 100, "p50_ms": 10, "p99_ms": 20}},
+            "peak_rss_mb": 100}
+    same = {**base, "scenarios": {"dashboard": {**base["scenarios"]["dashboard"], "p99_ms": 23}}}
+    assert compare(same, base, threshold=0.2) == []
+    slow = {**base, "scenarios": {"dashboard": {**base["scenarios"]["dashboard"], "p99_ms": 30, "throughput_rps": 50}}}
+    assert len(compare(slow, base, threshold=0.2)) == 2
+
+def test_percentile():
+    assert percentile(list(range(1, 101)), 50) == 50
+    assert percentile(list(range(1, 101)), 99) == 99
@@ -0,0 +1,53 @@
+import json
+import logging
+from app import db
+from app.models import Student
+from conftest import login, api_headers
+
+def _grades(app):
+    with app.app_context():
+        return {s.id: s.grade for s in Student.query.all()}
+
+def test_api_bulk_update_by_filter(app, client, caplog):
+    before = _grades(app)
+    etag = client.get("/api/students", headers=api_headers(app)).headers["ETag"]
+    with caplog.at_level(logging.INFO, logger="audit"):
+        resp = client.post("/api/students/bulk", headers=api_headers(app),
+                           json={"action": "update_grade", "filter": {"grade": "B"}, "grade": "A"})
+    expected = sorted(i for i, g in before.items() if g == "B")
+    assert resp.json == {"affected": 2, "ids": expected}
+    assert all(g == "A" for i, g in _grades(app).items() if i in expected)
+    events = [json.loads(r.getMessage()) for r in caplog.records if "students_bulk_update" in r.getMessage()]
+    assert len(events) == 1 and events[0]["ids"] == expected
+    assert client.get("/api/students", headers={**api_headers(app), "If-None-Match": etag}).status_code == 200
+
+def test_api_bulk_delete_requires_admin(app, client):
+    ids = list(_grades(app))[:2]
+    denied = client.post("/api/students/bulk", headers=api_headers(app, "teacher1"), json={"action": "delete", "ids": ids})
+    assert denied.status_code == 403
+    resp = client.post("/api/students/bulk", headers=api_headers(app), json={"action": "delete", "ids": ids + [9999]})
+    assert resp.json == {"affected": 2, "ids": sorted(ids)}
+    assert set(_grades(app)).isdisjoint(ids)
+
+def test_empty_selection_is_rejected(app, client):
+    resp = client.post("/api/students/bulk", headers=api_headers(app), json={"action": "delete"})
+    assert resp.status_code == 400
+    assert len(_grades(app)) == 4
+
+def test_malformed_body_is_rejected(app, client):
+    for body in ([1, 2], {"action": "delete", "ids": [1], "filter": ["A"]}):
+        resp = client.post("/api/students/bulk", headers=api_headers(app), json=body)
+        assert resp.status_code == 400
+    assert len(_grades(app)) == 4
+
+def test_admin_bulk_form(app, client):
+    login(client, "teacher1")
+    page = client.get("/admin/students/bulk").get_data(as_text=True)
+    assert "Set grade" in page and 'value="delete"' not in page
+    ids = list(_grades(app))
+    resp = client.post("/admin/students/bulk", data={"ids": ",".join(map(str, ids)), "current_grade": "",
+                                                      "action": "update_grade", "grade": "F"})
+    assert resp.status_code == 302
+    assert set(_grades(app).values()) == {"F"}
+    with app.app_context():
+        assert db.session.get(Student, ids[0]).grade == "F"
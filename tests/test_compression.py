@@ -0,0 +1,49 @@
+import gzip
+import json
+import zlib
+from app import db
+from app.models import Student
+from app.compression import _compress_stream
+from conftest import api_headers
+
+def _add_students(app, n):
+    with app.app_context():
+        db.session.add_all(Student(name=f"Bulk {i}", email=f"bulk{i}@example.com", grade="C") for i in range(n))
+        db.session.commit()
+
+def test_gzip_negotiated_above_threshold(app, client):
+    _add_students(app, 50)
+    headers = {**api_headers(app), "Accept-Encoding": "gzip"}
+    resp = client.get("/api/students", headers=headers)
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    students = json.loads(gzip.decompress(resp.data))
+    assert len(students) == 54
+    # The coded ETag still validates
+    again = client.get("/api/students", headers={**headers, "If-None-Match": resp.headers["ETag"]})
+    assert again.status_code == 304
+    # ...and the 304 carries the same validator and Vary as the 200
+    assert again.headers["ETag"] == resp.headers["ETag"] and resp.headers["ETag"].endswith('-gzip"')
+    assert set(again.headers["Vary"].split(", ")) == set(resp.headers["Vary"].split(", "))
+
+def test_small_or_unaccepted_responses_are_not_compressed(app, client):
+    headers = api_headers(app)
+    assert "Content-Encoding" not in client.get("/api/students", headers={**headers, "Accept-Encoding": "gzip"}).headers
+    _add_students(app, 50)
+    assert "Content-Encoding" not in client.get("/api/students", headers=headers).headers
+
+def test_columnar_shape(app, client):
+    headers = api_headers(app)
+    by_query = client.get("/api/students?format=columnar", headers=headers)
+    by_accept = client.get("/api/students", headers={**headers, "Accept": "application/vnd.sms.columnar+json"})
+    plain = client.get("/api/students", headers=headers)
+    assert by_query.json == by_accept.json
+    assert by_query.json["columns"] == ["id", "name", "email", "address", "grade"]
+    assert [dict(zip(by_query.json["columns"], r)) for r in by_query.json["rows"]] == plain.json
+    assert by_query.headers["ETag"] != plain.headers["ETag"]
+
+def test_streamed_chunks_decode_incrementally():
+    chunks = list(_compress_stream(iter(["data: 1\n\n", "data: 2\n\n"]), "gzip", 6))
+    d = zlib.decompressobj(31)
+    assert d.decompress(chunks[0]) == b"data: 1\n\n"
+    assert d.decompress(b"".join(chunks[1:])) == b"data: 2\n\n"
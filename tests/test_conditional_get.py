@@ -0,0 +1,69 @@
+import io
+from datetime import timedelta
+from werkzeug.http import http_date, parse_date
+from conftest import login, api_headers
+
+def test_api_students_returns_304_when_unchanged(app, client, monkeypatch):
+    headers = api_headers(app)
+    first = client.get("/api/students", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers.get("Last-Modified") is None  # students never written through the app yet
+
+    # An unchanged poll must not touch the rows (and so never decrypt)
+    monkeypatch.setattr("app.api_routes.decrypt_text", lambda *_: (_ for _ in ()).throw(AssertionError))
+    again = client.get("/api/students", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+def test_write_bumps_version_and_etag(app, client):
+    headers = api_headers(app)
+    etag = client.get("/api/students", headers=headers).headers["ETag"]
+    created = client.post("/api/students", headers=headers, json={"name": "New", "email": "new@example.com", "grade": "A"})
+    assert created.status_code == 201
+    resp = client.get("/api/students", headers={**headers, "If-None-Match": etag})
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
+    assert resp.headers["Last-Modified"]
+    # A date after the last change proves the client has it; the same second does not
+    later = http_date(parse_date(resp.headers["Last-Modified"]) + timedelta(seconds=1))
+    assert client.get("/api/students", headers={**headers, "If-Modified-Since": later}).status_code == 304
+
+def test_if_modified_since_misses_no_same_second_write(app, client):
+    headers = api_headers(app)
+    client.post("/api/students", headers=headers, json={"name": "One", "email": "one@example.com", "grade": "A"})
+    first = client.get("/api/students", headers=headers)
+    client.post("/api/students", headers=headers, json={"name": "Two", "email": "two@example.com", "grade": "A"})
+    again = client.get("/api/students", headers={**headers, "If-Modified-Since": first.headers["Last-Modified"]})
+    assert again.status_code == 200
+    assert {"One", "Two"} <= {s["name"] for s in again.json}
+
+def test_restore_moves_versions_past_every_cached_etag(app, client):
+    login(client, "admin")
+    backup = client.get("/admin/backup/download")
+    assert backup.status_code == 200
+    api, headers = app.test_client(), api_headers(app)
+    api.post("/api/students", headers=headers, json={"name": "Later", "email": "later@example.com", "grade": "A"})
+    seen = api.get("/api/students", headers=headers).headers["ETag"]
+    client.post("/admin/backup/restore", data={"file": (io.BytesIO(backup.data), "sms_backup.enc")},
+                content_type="multipart/form-data")
+    # Without moving past it, this write would bring back the version behind `seen`
+    api.post("/api/students", headers=headers, json={"name": "Other", "email": "other@example.com", "grade": "B"})
+    restored = api.get("/api/students", headers={**headers, "If-None-Match": seen})
+    assert restored.status_code == 200
+    assert "Later" not in {s["name"] for s in restored.json}
+
+def test_admin_list_etag_varies_by_viewer(app, client):
+    login(client, "admin")
+    admin_etag = client.get("/admin/students").headers["ETag"]
+    assert client.get("/admin/students", headers={"If-None-Match": admin_etag}).status_code == 304
+    login(client, "teacher1")
+    resp = client.get("/admin/students", headers={"If-None-Match": admin_etag})
+    assert resp.status_code == 200
+
+def test_revalidated_list_carries_no_csrf_token(app, client):
+    # A 304 replays the cached page, so it must not contain a per-session token
+    app.config["WTF_CSRF_ENABLED"] = True
+    login(client, "admin")
+    assert "csrf_token" not in client.get("/admin/students").get_data(as_text=True)
+    assert 'name="csrf_token"' in client.get("/admin/students/bulk").get_data(as_text=True)
@@ -0,0 +1,122 @@
+import json
+import os
+import queue
+import socket
+import subprocess
+import sys
+from app import db
+from app.events import EventBroker
+from app.models import User
+from conftest import login, api_headers
+
+def test_stream_pushes_grade_delta_on_api_create(app, client):
+    login(client)
+    resp = client.get("/dashboard/stream", buffered=False)
+    assert resp.mimetype == "text/event-stream"
+    chunks = resp.response
+    assert next(chunks).startswith(b"retry:")
+    created = client.post("/api/students", headers=api_headers(app), json={"name": "Live", "email": "live@example.com", "grade": "D"})
+    event = next(chunks).decode()
+    assert event.startswith("event: students.created")
+    payload = json.loads(event.split("data: ", 1)[1])
+    assert payload == {"type": "students.created", "ids": [created.json["id"]], "delta": {"D": 1}}
+    resp.close()
+
+def test_bulk_update_publishes_delta(app, client):
+    login(client)
+    resp = client.get("/dashboard/stream", buffered=False)
+    next(resp.response)
+    client.post("/api/students/bulk", headers=api_headers(app), json={"action": "update_grade", "filter": {"grade": "B"}, "grade": "A"})
+    payload = json.loads(next(resp.response).decode().split("data: ", 1)[1])
+    assert payload["delta"] == {"A": 2, "B": -2}
+    resp.close()
+
+def test_students_get_only_aggregate_deltas(app, client):
+    with app.app_context():
+        student = User(username="pupil", email="pupil@example.com", role="student")
+        student.password_hash = "x"
+        db.session.add(student)
+        db.session.commit()
+    login(client, "pupil")
+    resp = client.get("/dashboard/stream", buffered=False)
+    next(resp.response)
+    client.post("/api/students", headers=api_headers(app), json={"name": "Live", "email": "live@example.com", "grade": "D"})
+    payload = json.loads(next(resp.response).decode().split("data: ", 1)[1])
+    assert payload == {"type": "students.created", "delta": {"D": 1}}
+    resp.close()
+
+def test_stream_count_is_capped_per_process(app, client):
+    app.config["SSE_MAX_STREAMS"] = 1
+    login(client)
+    first = client.get("/dashboard/stream", buffered=False)
+    assert first.status_code == 200
+    busy = client.get("/dashboard/stream", buffered=False)
+    assert busy.status_code == 503 and busy.headers["Retry-After"]
+    first.close()
+    again = client.get("/dashboard/stream", buffered=False)
+    assert again.status_code == 200
+    again.close()
+
+def test_slow_subscriber_gets_resync():
+    broker = EventBroker(queue_size=2)
+    q = broker.subscribe()
+    for i in range(3):
+        broker.publish({"type": "students.created", "ids": [i], "delta": {"A": 1}})
+    assert q.get_nowait() == {"type": "resync"}
+
+def test_events_relay_to_other_process(tmp_path):
+    child = subprocess.Popen([sys.executable, "-c", (
+        "import json, sys\n"
+        "from app.events import EventBroker\n"
+        "b = EventBroker(); b.configure(sys.argv[1], b'relay-key'); q = b.subscribe()\n"
+        "print('ready', flush=True)\n"
+        "print(json.dumps(q.get(timeout=10)), flush=True)\n"
+    ), str(tmp_path)], stdout=subprocess.PIPE, text=True)
+    broker = EventBroker()
+    broker.configure(str(tmp_path), b"relay-key")
+    try:
+        assert child.stdout.readline().strip() == "ready"
+        event = {"type": "students.deleted", "ids": [7], "delta": {"C": -1}}
+        broker.publish(event)
+        assert json.loads(child.stdout.readline()) == event
+    finally:
+        child.kill()
+        broker._close_transport()
+
+def test_relay_drops_unsigned_and_forged_datagrams(tmp_path):
+    broker = EventBroker()
+    broker.configure(str(tmp_path / "peers"), b"relay-key")
+    q = broker.subscribe()
+    port = broker._sock.getsockname()[1]
+    event = json.dumps({"type": "students.deleted", "ids": [1], "delta": {"A": -1}}).encode()
+    forger = EventBroker()
+    forger.configure(str(tmp_path / "other"), b"wrong-key")
+    try:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            sock.sendto(event, ("127.0.0.1", port))
+            sock.sendto(forger._sign(event) + event, ("127.0.0.1", port))
+            sock.sendto(broker._sign(event) + event, ("127.0.0.1", port))
+        assert q.get(timeout=5) == json.loads(event)
+        try:
+            q.get(timeout=0.2)
+            raise AssertionError("a forged datagram was delivered")
+        except queue.Empty:
+            pass
+    finally:
+        broker._close_transport()
+
+def test_relay_refuses_a_shared_peer_dir(tmp_path):
+    peer_dir = tmp_path / "peers"
+    peer_dir.mkdir()
+    os.chmod(peer_dir, 0o777)
+    broker = EventBroker()
+    broker.configure(str(peer_dir), b"relay-key")
+    broker.subscribe()
+    assert broker._sock is None and list(peer_dir.iterdir()) == []
+    fresh = EventBroker()
+    fresh.configure(str(tmp_path / "new"), b"relay-key")
+    fresh.subscribe()
+    try:
+        assert os.stat(tmp_path / "new").st_mode & 0o777 == 0o700
+    finally:
+        fresh._close_transport()
@@ -0,0 +1,49 @@
+import logging
+from app.fragment_cache import FragmentCache, fragment_cache
+from conftest import login, api_headers
+
+def test_repeat_view_skips_query_and_render(app, client, monkeypatch):
+    login(client)
+    first = client.get("/admin/students").data
+    monkeypatch.setattr("app.admin_routes.decrypt_text", lambda *_: (_ for _ in ()).throw(AssertionError))
+    assert client.get("/admin/students").data == first
+    assert len(fragment_cache) == 1
+
+def test_unused_query_args_share_one_fragment(app, client):
+    login(client)
+    for i in range(3):
+        assert client.get(f"/admin/students?x={i}").status_code == 200
+    assert len(fragment_cache) == 1
+
+def test_fragment_keyed_by_role(app, client):
+    login(client, "admin")
+    assert b"btn-danger" in client.get("/admin/students").data
+    login(client, "teacher1")
+    assert b"btn-danger" not in client.get("/admin/students").data
+    assert len(fragment_cache) == 2
+
+def test_writes_invalidate_fragments(app, client):
+    login(client)
+    client.get("/admin/students")
+    client.post("/api/students", headers=api_headers(app), json={"name": "Newest", "email": "newest@example.com", "grade": "A"})
+    assert len(fragment_cache) == 0
+    assert b"Newest" in client.get("/admin/students").data
+    client.post("/admin/teachers/new", data={"name": "Ada Teach", "email": "ada@example.com", "department": "CS"})
+    assert b"Ada Teach" in client.get("/admin/teachers").data
+
+def test_lru_is_bounded_by_size():
+    cache = FragmentCache(max_bytes=10)
+    cache.put(("students", 1, (), "admin"), "aaaaaa")
+    cache.put(("students", 2, (), "admin"), "bbbbbb")
+    assert len(cache) == 1 and cache.size == 6
+    assert cache.get(("students", 2, (), "admin")) == "bbbbbb"
+
+def test_size_is_counted_in_bytes_and_oversize_is_logged(caplog):
+    cache = FragmentCache(max_bytes=10)
+    cache.put(("students", 1, (), "admin"), "é" * 4)
+    assert cache.size == 8
+    with caplog.at_level(logging.WARNING, logger="app.fragment_cache"):
+        cache.put(("students", 2, (), "admin"), "é" * 6)
+        cache.put(("students", 3, (), "admin"), "é" * 6)
+    assert cache.get(("students", 2, (), "admin")) is None and cache.size == 8
+    assert len(caplog.records) == 1 and "12 bytes" in caplog.text
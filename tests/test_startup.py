@@ -0,0 +1,47 @@
+import json
+import os
+import subprocess
+import sys
+import pytest
+from app import get_mail
+from startup_report import compare_gunicorn
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "benchmarks", "startup_baseline.json")
+
+def test_mail_is_initialized_lazily(app):
+    assert "mail" not in app.extensions
+    with app.app_context():
+        get_mail()
+    assert "mail" in app.extensions
+
+def test_startup_profile_records_phases(app):
+    names = [p["phase"] for p in app.startup_profile.phases]
+    assert names[:3] == ["load_dotenv", "extensions", "blueprints"]
+    assert app.startup_profile.total_ms > 0
+
+def test_cold_start_against_baseline(tmp_path):
+    # A fresh interpreter so imports are really cold. Module count is
+    # deterministic; wall-clock is compared by `startup_report.py --baseline`.
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}")
+    out = subprocess.run([sys.executable, "startup_report.py", "--json"], cwd=ROOT, env=env,
+                         check=True, capture_output=True, text=True).stdout
+    report = json.loads(out)
+    with open(BASELINE) as fh:
+        baseline = json.load(fh)["after"]
+    assert report["first_response_status"] == 200
+    assert not report["mail_loaded"]
+    assert report["modules_loaded"] <= baseline["modules_loaded"]
+
+def test_preloaded_workers_start_within_baseline(tmp_path):
+    pytest.importorskip("gunicorn")
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}")
+    out = subprocess.run([sys.executable, "startup_report.py", "--gunicorn", "--runs", "3", "--json"], cwd=ROOT,
+                         env=env, check=True, capture_output=True, text=True).stdout
+    report = json.loads(out)
+    with open(BASELINE) as fh:
+        baseline = json.load(fh)["gunicorn"]
+    assert compare_gunicorn(report, baseline, tolerance=0.25) == []
+    # The cut itself: forked workers skip create_app
+    assert report["preload"]["fork_to_ready_ms"] < report["no_preload"]["fork_to_ready_ms"] / 10
+    assert report["preload"]["launch_to_first_response_ms"] < report["no_preload"]["launch_to_first_response_ms"]
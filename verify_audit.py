@@ -0,0 +1,42 @@
+"""Verify the tamper-evident HMAC chain of the audit log, including rotated files.
+
+    python verify_audit.py [logs/audit.log] [--json] [--expect-head HASH]
+
+The key is AUDIT_HMAC_KEY, else SECRET_KEY (from the environment or .env),
+the same one the app signs with. ``--expect-head`` takes a head hash printed
+by an earlier run and kept somewhere the log's writers cannot reach; it
+catches records cut off the end of the log.
+
+Exit status is 0 when the chain is intact, 1 otherwise.
+"""
+import json
+import sys
+from dotenv import load_dotenv
+from app.audit_sink import audit_files, audit_key, verify_chain
+
+load_dotenv()
+argv = sys.argv[1:]
+expect_head = None
+if "--expect-head" in argv:
+    i = argv.index("--expect-head")
+    expect_head = argv[i + 1] if i + 1 < len(argv) else None
+    del argv[i:i + 2]
+    if not expect_head:
+        print("--expect-head needs a hash")
+        sys.exit(2)
+args = [a for a in argv if not a.startswith("--")]
+path = args[0] if args else "logs/audit.log"
+files = audit_files(path)
+if not files:
+    print(f"No audit log found at {path}")
+    sys.exit(1)
+result = verify_chain(files, audit_key(), expect_head)
+if "--json" in argv:
+    print(json.dumps(result, indent=2))
+else:
+    print(f"Checked {result['records']} records in {len(files)} files ({result['legacy']} legacy unchained lines)")
+    for err in result["errors"]:
+        print(f"FAIL {err}")
+    if not result["errors"]:
+        print(f"OK chain intact; head seq {result['last_seq']} hash {result['head']}")
+sys.exit(1 if result["errors"] else 0)